@@ -0,0 +1,39 @@
+"""Add composite indexes for live document and entity lookups
+
+Revision ID: 004_add_live_indexes
+Revises: 003_add_digilocker
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_add_live_indexes'
+down_revision: Union[str, None] = '003_add_digilocker'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Approved, non-deleted entities per user, newest first within each type
+    op.create_index(
+        'ix_entity_user_approved_live',
+        'extracted_entities',
+        ['user_id', 'is_approved', 'is_deleted', 'entity_type', sa.text('created_at DESC')]
+    )
+    
+    # Non-deleted documents per user ordered by upload time
+    op.create_index(
+        'ix_doc_user_live',
+        'documents',
+        ['user_id', 'is_deleted', sa.text('uploaded_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_doc_user_live', table_name='documents')
+    op.drop_index('ix_entity_user_approved_live', table_name='extracted_entities')
@@ -0,0 +1,56 @@
+"""Store encrypted values as plain Fernet tokens
+
+Revision ID: 005_unwrap_encrypted
+Revises: 004_add_live_indexes
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+import base64
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_unwrap_encrypted'
+down_revision: Union[str, None] = '004_add_live_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Encrypted columns: (table, primary key, column)
+ENCRYPTED_COLUMNS = [
+    ('extracted_entities', 'id', 'encrypted_value'),
+    ('extracted_entities', 'id', 'translated_value'),
+    ('users', 'id', 'digilocker_access_token'),
+    ('users', 'id', 'digilocker_refresh_token'),
+]
+
+# base64 of the "gAAAAA" prefix every Fernet token starts with
+WRAPPED_PREFIX = 'Z0FBQUFB'
+TOKEN_PREFIX = 'gAAAAA'
+
+
+def _rewrite(prefix: str, convert) -> None:
+    """Apply convert to every value in the encrypted columns that starts with prefix"""
+    bind = op.get_bind()
+    for table, pk, column in ENCRYPTED_COLUMNS:
+        rows = bind.execute(
+            sa.text(f"SELECT {pk}, {column} FROM {table} WHERE {column} LIKE :prefix"),
+            {"prefix": f"{prefix}%"}
+        ).fetchall()
+        for row_id, value in rows:
+            bind.execute(
+                sa.text(f"UPDATE {table} SET {column} = :value WHERE {pk} = :id"),
+                {"value": convert(value), "id": row_id}
+            )
+
+
+def upgrade() -> None:
+    # Drop the redundant outer base64 layer around Fernet tokens
+    _rewrite(WRAPPED_PREFIX, lambda value: base64.urlsafe_b64decode(value).decode('ascii'))
+
+
+def downgrade() -> None:
+    _rewrite(TOKEN_PREFIX, lambda value: base64.urlsafe_b64encode(value.encode('ascii')).decode('ascii'))
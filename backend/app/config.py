@@ -3,7 +3,7 @@ Application Configuration
 Manages all environment variables and settings
 """
 import os
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./form_assistant.db"
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_STATEMENT_CACHE_SIZE: int = 1024  # Prepared statements cached per asyncpg connection
     
     # Security
     SECRET_KEY: str = "your-super-secret-key-change-in-production-min-32-chars"
@@ -32,6 +33,9 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200  # 30 days in minutes
     REFRESH_TOKEN_EXPIRE_DAYS: int = 90  # 90 days for refresh token
+    KDF_MODE: Literal["hkdf", "pbkdf2"] = "hkdf"  # Data-encryption key derivation; "pbkdf2" where policy requires it
+    BCRYPT_COST: int = 12  # bcrypt work factor for new password hashes (pick one with calibrate_bcrypt.py)
+    BCRYPT_WORKERS: int = 0  # Password hashing threads (0 = CPU count)
     
     # CORS
     ALLOWED_ORIGINS: List[str] = [
@@ -57,6 +61,11 @@ class Settings(BaseSettings):
         "kannada": "kan",
         "malayalam": "mal"
     }
+    OCR_WORKERS: int = 0  # Parallel page OCR threads (0 = CPU count)
+    # LSTM engine only, and skip the word dictionaries (they "correct" ID numbers and codes)
+    OCR_TESSERACT_CONFIG: str = "--oem 1 -c load_system_dawg=0 -c load_freq_dawg=0"
+    PDF_DPI: int = 150  # First-pass PDF render resolution
+    PDF_DPI_MAX: int = 300  # Re-render resolution when first-pass OCR confidence is low
     
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
@@ -71,6 +80,7 @@ class Settings(BaseSettings):
     DIGILOCKER_CLIENT_SECRET: str = ""  # Your DigiLocker Partner Client Secret
     DIGILOCKER_REDIRECT_URI: str = "http://localhost:8000/digilocker/auth/callback"
     DIGILOCKER_SANDBOX: bool = True  # Set to False for production
+    DIGILOCKER_HTTP2: bool = True  # Multiplex concurrent API calls; set False to force HTTP/1.1
     
     class Config:
         env_file = ".env"
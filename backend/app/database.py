@@ -12,6 +12,7 @@ from app.config import settings
 
 # Check if using SQLite
 is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+is_asyncpg = settings.DATABASE_URL.startswith("postgresql+asyncpg")
 
 # Create async engine with appropriate settings
 if is_sqlite:
@@ -28,6 +29,12 @@ else:
         poolclass=NullPool if settings.ENVIRONMENT == "test" else None,
         pool_size=settings.DATABASE_POOL_SIZE if settings.ENVIRONMENT != "test" else None,
         max_overflow=settings.DATABASE_MAX_OVERFLOW if settings.ENVIRONMENT != "test" else None,
+        pool_pre_ping=True,
+        # Reuse server-side prepared statements for the repeated entity/document queries
+        connect_args={
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        } if is_asyncpg else {},
     )
 
 # Create async session factory
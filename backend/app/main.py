@@ -17,6 +17,9 @@ from app.database import init_db, close_db
 from app.routers import auth, documents, user, voice, digilocker
 from app.middleware.rate_limiter import RateLimitMiddleware
 from app.middleware.audit_logger import AuditLogMiddleware
+from app.services.consent_service import consent_log_writer
+from app.services.digilocker_service import digilocker_service
+from app.utils.security import sha256_is_accelerated
 
 
 # Configure logging
@@ -45,13 +48,20 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.TEMP_UPLOAD_DIR, exist_ok=True)
     os.makedirs("logs", exist_ok=True)
     
+    # Upload and OCR cache hashing is SHA-256; warn when it isn't the OpenSSL build
+    if not sha256_is_accelerated():
+        logger.warning("hashlib.sha256 is not OpenSSL-backed; file hashing will be slow")
+    
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+    consent_log_writer.start()
     
     yield
     
     # Shutdown
+    await consent_log_writer.stop()
+    await digilocker_service.aclose()
     await close_db()
     logger.info("Application shutdown complete")
 
@@ -4,7 +4,7 @@ Database models for uploaded documents and extracted data
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -24,6 +24,10 @@ class DocumentType(str, enum.Enum):
     OTHER = "other"
 
 
+# Value sets for O(1) membership checks on raw strings
+DOCUMENT_TYPE_VALUES = frozenset(t.value for t in DocumentType)
+
+
 class DocumentStatus(str, enum.Enum):
     """Document processing status"""
     UPLOADED = "uploaded"
@@ -62,6 +66,11 @@ class Document(Base):
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime, nullable=True)
     
+    # Covers the live-documents-per-user listing ordered by upload time
+    __table_args__ = (
+        Index("ix_doc_user_live", user_id, is_deleted, uploaded_at.desc()),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="documents")
     extracted_entities = relationship("ExtractedEntity", back_populates="document", cascade="all, delete-orphan")
@@ -111,6 +120,9 @@ class EntityType(str, enum.Enum):
     ISSUE_DATE = "issue_date"
 
 
+ENTITY_TYPE_VALUES = frozenset(t.value for t in EntityType)
+
+
 class ExtractedEntity(Base):
     """Extracted entity from document"""
     __tablename__ = "extracted_entities"
@@ -145,6 +157,14 @@ class ExtractedEntity(Base):
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime, nullable=True)
     
+    # Covers the approved, live entity lookups (profile, autofill, latest per type)
+    __table_args__ = (
+        Index(
+            "ix_entity_user_approved_live",
+            user_id, is_approved, is_deleted, entity_type, created_at.desc()
+        ),
+    )
+    
     # Relationships
     document = relationship("Document", back_populates="extracted_entities")
     
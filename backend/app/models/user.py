@@ -14,6 +14,9 @@ from app.database import Base
 class User(Base):
     """User account model"""
     __tablename__ = "users"
+    # Fetch generated column values in the INSERT/UPDATE itself (RETURNING)
+    # instead of needing a follow-up refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
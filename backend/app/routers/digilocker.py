@@ -3,7 +3,6 @@ DigiLocker Routes
 API endpoints for DigiLocker OAuth and document fetching
 """
 import secrets
-import base64
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
@@ -15,7 +14,10 @@ from loguru import logger
 
 from app.database import get_db
 from app.models.user import User
-from app.models.document import Document, ExtractedEntity, DocumentType, DocumentStatus, EntityType
+from app.models.document import (
+    Document, ExtractedEntity, DocumentType, DocumentStatus, EntityType,
+    DOCUMENT_TYPE_VALUES, ENTITY_TYPE_VALUES
+)
 from app.routers.dependencies import get_current_user
 from app.services.digilocker_service import digilocker_service
 from app.schemas.digilocker import (
@@ -24,15 +26,35 @@ from app.schemas.digilocker import (
     DigiLockerDocumentsResponse, DigiLockerDocument,
     DigiLockerPullRequest, DigiLockerExtractedData,
     DigiLockerConnectionStatus, DigiLockerDisconnectResponse,
-    DigiLockerImportRequest, DigiLockerImportResponse
+    DigiLockerImportRequest, DigiLockerImportResponse, DigiLockerImportResult
 )
-from app.utils.security import encrypt_value
+from app.utils.security import encrypt_value, decrypt_value
 
 router = APIRouter(prefix="/digilocker", tags=["DigiLocker Integration"])
 
 # In-memory storage for OAuth state (use Redis in production)
 oauth_states = {}
 
+# Maximum number of documents pulled from DigiLocker in parallel during import
+IMPORT_CONCURRENCY = 3
+
+
+def _get_refresh_token(user: User) -> Optional[str]:
+    """Decrypt the user's DigiLocker refresh token, if any"""
+    if not user.digilocker_refresh_token:
+        return None
+    return decrypt_value(user.digilocker_refresh_token)
+
+
+async def _get_access_token(user: User) -> Optional[str]:
+    """Get a valid DigiLocker access token for the user, refreshing it if needed"""
+    return await digilocker_service.get_valid_token(
+        session_key=str(user.id),
+        refresh_token=_get_refresh_token(user),
+        stored_token=decrypt_value(user.digilocker_access_token),
+        stored_expires_at=user.digilocker_token_expires_at
+    )
+
 
 @router.post("/auth/initiate", response_model=DigiLockerAuthResponse)
 async def initiate_digilocker_auth(
@@ -130,7 +152,8 @@ async def digilocker_callback(
         user = result.fetchone()
         
         if user:
-            # Store encrypted tokens
+            # Store encrypted tokens; one clock read so the expiry counts from connected_at exactly
+            now = datetime.utcnow()
             await db.execute(
                 User.__table__.update()
                 .where(User.id == user_id)
@@ -139,13 +162,18 @@ async def digilocker_callback(
                     digilocker_refresh_token=encrypt_value(token_response.get("refresh_token", "")),
                     digilocker_id=token_response.get("digilocker_id"),
                     digilocker_name=token_response.get("name"),
-                    digilocker_connected_at=datetime.utcnow(),
-                    digilocker_token_expires_at=datetime.utcnow() + timedelta(
+                    digilocker_connected_at=now,
+                    digilocker_token_expires_at=now + timedelta(
                         seconds=token_response.get("expires_in", 3600)
                     )
                 )
             )
             await db.commit()
+            digilocker_service.cache_access_token(
+                str(user_id),
+                token_response.get("access_token", ""),
+                token_response.get("expires_in", 3600)
+            )
             
         logger.info(f"DigiLocker connected for user {user_id}")
         
@@ -213,12 +241,18 @@ async def digilocker_callback_post(
             )
             current_user.digilocker_id = token_response.get("digilocker_id")
             current_user.digilocker_name = token_response.get("name")
-            current_user.digilocker_connected_at = datetime.utcnow()
-            current_user.digilocker_token_expires_at = datetime.utcnow() + timedelta(
+            now = datetime.utcnow()
+            current_user.digilocker_connected_at = now
+            current_user.digilocker_token_expires_at = now + timedelta(
                 seconds=token_response.get("expires_in", 3600)
             )
             
             await db.commit()
+            digilocker_service.cache_access_token(
+                str(current_user.id),
+                token_response.get("access_token", ""),
+                token_response.get("expires_in", 3600)
+            )
             
         return DigiLockerTokenResponse(
             success=token_response.get("success", False),
@@ -279,6 +313,7 @@ async def disconnect_digilocker(
         current_user.digilocker_token_expires_at = None
         
         await db.commit()
+        digilocker_service.invalidate_token(str(current_user.id))
         
         logger.info(f"DigiLocker disconnected for user {current_user.id}")
         
@@ -310,32 +345,19 @@ async def get_digilocker_documents(
         )
     
     try:
-        from app.utils.security import decrypt_value
-        access_token = decrypt_value(current_user.digilocker_access_token)
-        
-        # Check if token expired and try refresh
-        if current_user.digilocker_token_expires_at:
-            if datetime.utcnow() > current_user.digilocker_token_expires_at:
-                # Try to refresh token
-                if current_user.digilocker_refresh_token:
-                    refresh_token = decrypt_value(current_user.digilocker_refresh_token)
-                    refresh_result = await digilocker_service.refresh_access_token(refresh_token)
-                    
-                    if refresh_result.get("success"):
-                        access_token = refresh_result.get("access_token")
-                        # Update stored token
-                        current_user.digilocker_access_token = encrypt_value(access_token)
-                        current_user.digilocker_token_expires_at = datetime.utcnow() + timedelta(
-                            seconds=refresh_result.get("expires_in", 3600)
-                        )
-                    else:
-                        return DigiLockerDocumentsResponse(
-                            success=False,
-                            error="DigiLocker session expired. Please reconnect."
-                        )
+        access_token = await _get_access_token(current_user)
+        if not access_token:
+            return DigiLockerDocumentsResponse(
+                success=False,
+                error="DigiLocker session expired. Please reconnect."
+            )
         
         # Fetch documents
-        result = await digilocker_service.get_issued_documents(access_token)
+        result = await digilocker_service.get_issued_documents(
+            access_token,
+            session_key=str(current_user.id),
+            refresh_token=_get_refresh_token(current_user)
+        )
         
         if result.get("success"):
             documents = [
@@ -378,14 +400,21 @@ async def pull_document(
         )
     
     try:
-        from app.utils.security import decrypt_value
-        access_token = decrypt_value(current_user.digilocker_access_token)
+        access_token = await _get_access_token(current_user)
+        if not access_token:
+            return DigiLockerExtractedData(
+                success=False,
+                doc_type=request.doc_type or "unknown",
+                error="DigiLocker session expired. Please reconnect."
+            )
         
         # Pull document
         result = await digilocker_service.pull_document(
             access_token=access_token,
             uri=request.uri,
-            doc_type=request.doc_type
+            doc_type=request.doc_type,
+            session_key=str(current_user.id),
+            refresh_token=_get_refresh_token(current_user)
         )
         
         if not result.get("success"):
@@ -402,8 +431,12 @@ async def pull_document(
             import tempfile
             import os
             
-            content = base64.b64decode(result.get("data", ""))
-            doc_type_enum = getattr(DocumentType, request.doc_type.upper(), DocumentType.AADHAAR)
+            content = result.get("content", b"")
+            doc_type_value = request.doc_type.lower()
+            doc_type_enum = (
+                DocumentType(doc_type_value) if doc_type_value in DOCUMENT_TYPE_VALUES
+                else DocumentType.AADHAAR
+            )
             
             with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
                 f.write(content)
@@ -457,36 +490,53 @@ async def import_documents(
         )
     
     try:
-        from app.utils.security import decrypt_value
-        access_token = decrypt_value(current_user.digilocker_access_token)
+        access_token = await _get_access_token(current_user)
+        if not access_token:
+            return DigiLockerImportResponse(
+                success=False,
+                error="DigiLocker session expired. Please reconnect."
+            )
         
         imported = 0
         failed = 0
         results = []
         
         # First get document list to map URIs to types
-        docs_result = await digilocker_service.get_issued_documents(access_token)
+        session_key = str(current_user.id)
+        refresh_token = _get_refresh_token(current_user)
+        docs_result = await digilocker_service.get_issued_documents(
+            access_token, session_key=session_key, refresh_token=refresh_token
+        )
         doc_map = {d["uri"]: d for d in docs_result.get("documents", [])}
         
-        for uri in request.document_uris:
+        # Pull documents concurrently (bounded to stay within DigiLocker's
+        # rate limits), then persist them one by one on the shared session
+        pulled = await digilocker_service.pull_documents(
+            access_token,
+            [
+                (uri, doc_map.get(uri, {}).get("doc_type", "aadhaar"))
+                for uri in request.document_uris
+            ],
+            concurrency=IMPORT_CONCURRENCY,
+            session_key=session_key,
+            refresh_token=refresh_token
+        )
+        
+        for uri, result in zip(request.document_uris, pulled):
             try:
+                if isinstance(result, Exception):
+                    raise result
+                
                 doc_info = doc_map.get(uri, {})
                 doc_type = doc_info.get("doc_type", "aadhaar")
                 
-                # Pull and extract document
-                result = await digilocker_service.pull_document(
-                    access_token=access_token,
-                    uri=uri,
-                    doc_type=doc_type
-                )
-                
                 if not result.get("success"):
                     failed += 1
-                    results.append({
-                        "uri": uri,
-                        "success": False,
-                        "error": result.get("error")
-                    })
+                    results.append(DigiLockerImportResult(
+                        uri=uri,
+                        success=False,
+                        error=result.get("error")
+                    ))
                     continue
                 
                 # Map to our document type enum
@@ -519,10 +569,10 @@ async def import_documents(
                 # Save extracted entities
                 entities = result.get("entities", [])
                 for entity_data in entities:
-                    entity_type_str = entity_data.get("entity_type", "").upper()
-                    entity_type = getattr(EntityType, entity_type_str, None)
+                    entity_type_str = entity_data.get("entity_type", "").lower()
                     
-                    if entity_type:
+                    if entity_type_str in ENTITY_TYPE_VALUES:
+                        entity_type = EntityType(entity_type_str)
                         entity = ExtractedEntity(
                             document_id=document.id,
                             user_id=current_user.id,
@@ -538,22 +588,22 @@ async def import_documents(
                 
                 await db.commit()
                 imported += 1
-                results.append({
-                    "uri": uri,
-                    "success": True,
-                    "document_id": str(document.id),
-                    "doc_type": doc_type,
-                    "entities_count": len(entities)
-                })
+                results.append(DigiLockerImportResult(
+                    uri=uri,
+                    success=True,
+                    document_id=str(document.id),
+                    doc_type=doc_type,
+                    entities_count=len(entities)
+                ))
                 
             except Exception as e:
                 logger.exception(f"Error importing document {uri}: {e}")
                 failed += 1
-                results.append({
-                    "uri": uri,
-                    "success": False,
-                    "error": str(e)
-                })
+                results.append(DigiLockerImportResult(
+                    uri=uri,
+                    success=False,
+                    error=str(e)
+                ))
         
         return DigiLockerImportResponse(
             success=imported > 0,
@@ -585,10 +635,19 @@ async def get_eaadhaar(
         )
     
     try:
-        from app.utils.security import decrypt_value
-        access_token = decrypt_value(current_user.digilocker_access_token)
+        access_token = await _get_access_token(current_user)
+        if not access_token:
+            return DigiLockerExtractedData(
+                success=False,
+                doc_type="aadhaar",
+                error="DigiLocker session expired. Please reconnect."
+            )
         
-        result = await digilocker_service.get_eaadhaar(access_token)
+        result = await digilocker_service.get_eaadhaar(
+            access_token,
+            session_key=str(current_user.id),
+            refresh_token=_get_refresh_token(current_user)
+        )
         
         return DigiLockerExtractedData(
             success=result.get("success", False),
@@ -13,6 +13,7 @@ from app.schemas.document import (
     DocumentUploadResponse, ExtractedDataPreview, ConfirmDataRequest
 )
 from app.services.document_service import DocumentService
+from app.services.ocr_service import invalidate_cached_results
 from app.routers.dependencies import get_current_user
 from app.utils.file_utils import validate_file, save_temp_file, sanitize_filename
 
@@ -60,7 +61,7 @@ async def upload_document(
     # Sanitize filename
     safe_filename = sanitize_filename(file.filename)
     
-    # Save to temp storage
+    # Save to temp storage (size and magic bytes are checked while streaming)
     file_path, file_hash, file_size = await save_temp_file(file, str(current_user.id))
     
     # Create document record
@@ -257,5 +258,6 @@ async def delete_document(
     )
     
     await db.commit()
+    invalidate_cached_results([document.file_hash])
     
     return {"message": "Document deleted successfully"}
@@ -275,8 +275,8 @@ async def delete_account(
         )
     
     # Verify password
-    from app.utils.security import verify_password
-    if not verify_password(password, current_user.hashed_password):
+    from app.utils.security import averify_password
+    if not await averify_password(password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
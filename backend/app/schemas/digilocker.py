@@ -37,6 +37,10 @@ class DigiLockerTokenResponse(BaseModel):
     name: Optional[str] = None
     error: Optional[str] = None
 
+    class Config:
+        frozen = True
+        extra = "forbid"
+
 
 class DigiLockerDocument(BaseModel):
     """Document metadata from DigiLocker"""
@@ -58,6 +62,10 @@ class DigiLockerDocumentsResponse(BaseModel):
     total: int = 0
     error: Optional[str] = None
 
+    class Config:
+        frozen = True
+        extra = "forbid"
+
 
 class DigiLockerPullRequest(BaseModel):
     """Request to pull/download a document"""
@@ -104,10 +112,28 @@ class DigiLockerImportRequest(BaseModel):
     document_uris: List[str] = Field(..., description="List of document URIs to import")
 
 
+class DigiLockerImportResult(BaseModel):
+    """Outcome of importing a single DigiLocker document"""
+    uri: str
+    success: bool
+    error: Optional[str] = None
+    document_id: Optional[str] = None
+    doc_type: Optional[str] = None
+    entities_count: Optional[int] = None
+
+    class Config:
+        frozen = True
+        extra = "forbid"
+
+
 class DigiLockerImportResponse(BaseModel):
     """Response after importing documents"""
     success: bool
     imported: int = 0
     failed: int = 0
-    results: List[dict] = []
+    results: List[DigiLockerImportResult] = []
     error: Optional[str] = None
+
+    class Config:
+        frozen = True
+        extra = "forbid"
@@ -217,3 +217,7 @@ class AutofillResponse(BaseModel):
     fields: Dict[str, str]  # field_id -> value
     consent_log_id: str
     expires_at: datetime
+    
+    class Config:
+        frozen = True
+        extra = "forbid"
@@ -50,6 +50,8 @@ class VoiceInputResponse(BaseModel):
     requires_approval: bool = True
     
     class Config:
+        frozen = True
+        extra = "forbid"
         json_schema_extra = {
             "example": {
                 "success": True,
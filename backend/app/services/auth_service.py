@@ -6,18 +6,46 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, bindparam
 from loguru import logger
 
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserLogin, Token
 from app.utils.security import (
-    hash_password, verify_password, create_access_token,
+    ahash_password, averify_password, create_access_token,
     create_refresh_token, decode_token
 )
 from app.config import settings
 
 
+# Fixed UPDATE statements for the login path, built once at import so the
+# compiled SQL is reused from SQLAlchemy's statement cache on every call
+_STMT_RECORD_LOGIN = (
+    update(User)
+    .where(User.id == bindparam("uid"))
+    .values(failed_login_attempts="0", locked_until=None, last_login=bindparam("ts"))
+    .execution_options(synchronize_session=False)
+)
+_STMT_FAILED_LOGIN = (
+    update(User)
+    .where(User.id == bindparam("uid"))
+    .values(failed_login_attempts=bindparam("attempts"))
+    .execution_options(synchronize_session=False)
+)
+_STMT_LOCK_ACCOUNT = (
+    update(User)
+    .where(User.id == bindparam("uid"))
+    .values(failed_login_attempts=bindparam("attempts"), locked_until=bindparam("locked_until"))
+    .execution_options(synchronize_session=False)
+)
+_STMT_CHANGE_PASSWORD = (
+    update(User)
+    .where(User.id == bindparam("uid"))
+    .values(hashed_password=bindparam("hashed_password"), updated_at=bindparam("ts"))
+    .execution_options(synchronize_session=False)
+)
+
+
 class AuthService:
     """Authentication service for user management"""
     
@@ -42,18 +70,19 @@ class AuthService:
         # Create user
         user = User(
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await ahash_password(user_data.password),
             phone_number=user_data.phone_number,
             full_name=user_data.full_name,
             is_active=True,
             is_verified=False
         )
         
+        # Defaults are populated during flush (eager_defaults) and the session
+        # keeps them after commit, so no refresh SELECT is needed
         self.db.add(user)
         await self.db.commit()
-        await self.db.refresh(user)
         
-        logger.info(f"Created new user: {user.email}")
+        logger.info("Created new user: {}", user.email)
         return user
     
     async def authenticate_user(self, login_data: UserLogin) -> Tuple[Optional[User], str]:
@@ -61,31 +90,29 @@ class AuthService:
         Authenticate user with email and password
         Returns (user, error_message)
         """
+        now = datetime.utcnow()
         user = await self._get_user_by_email(login_data.email)
         
         if not user:
             return None, "Invalid email or password"
         
+        # Deleted accounts are already excluded by the lookup query
         if not user.is_active:
             return None, "Account is deactivated"
         
-        if user.is_deleted:
-            return None, "Account has been deleted"
-        
-        # Check if account is locked
-        if user.locked_until and user.locked_until > datetime.utcnow():
+        # Check if account is locked (before the costly password hash check)
+        if user.locked_until and user.locked_until > now:
             return None, f"Account locked until {user.locked_until.isoformat()}"
         
         # Verify password
-        if not verify_password(login_data.password, user.hashed_password):
-            await self._handle_failed_login(user)
+        if not await averify_password(login_data.password, user.hashed_password):
+            await self._handle_failed_login(user, now)
             return None, "Invalid email or password"
         
-        # Reset failed attempts on successful login
-        await self._reset_failed_attempts(user)
-        await self._update_last_login(user)
+        # Reset failed attempts and record the login in one statement
+        await self._record_successful_login(user, now)
         
-        logger.info(f"User authenticated: {user.email}")
+        logger.info("User authenticated: {}", user.email)
         return user, ""
     
     async def create_tokens(self, user: User) -> Token:
@@ -144,39 +171,26 @@ class AuthService:
         )
         return result.scalar_one_or_none()
     
-    async def _handle_failed_login(self, user: User):
+    async def _handle_failed_login(self, user: User, now: datetime):
         """Handle failed login attempt"""
         attempts = int(user.failed_login_attempts or "0") + 1
         
-        update_data = {"failed_login_attempts": str(attempts)}
-        
         # Lock account after 5 failed attempts
         if attempts >= 5:
-            update_data["locked_until"] = datetime.utcnow() + timedelta(minutes=30)
-            logger.warning(f"Account locked due to failed attempts: {user.email}")
+            await self.db.execute(_STMT_LOCK_ACCOUNT, {
+                "uid": user.id,
+                "attempts": str(attempts),
+                "locked_until": now + timedelta(minutes=30)
+            })
+            logger.warning("Account locked due to failed attempts: {}", user.email)
+        else:
+            await self.db.execute(_STMT_FAILED_LOGIN, {"uid": user.id, "attempts": str(attempts)})
         
-        await self.db.execute(
-            update(User).where(User.id == user.id).values(**update_data)
-        )
         await self.db.commit()
     
-    async def _reset_failed_attempts(self, user: User):
-        """Reset failed login attempts"""
-        await self.db.execute(
-            update(User).where(User.id == user.id).values(
-                failed_login_attempts="0",
-                locked_until=None
-            )
-        )
-        await self.db.commit()
-    
-    async def _update_last_login(self, user: User):
-        """Update last login timestamp"""
-        await self.db.execute(
-            update(User).where(User.id == user.id).values(
-                last_login=datetime.utcnow()
-            )
-        )
+    async def _record_successful_login(self, user: User, now: datetime):
+        """Reset failed login attempts and update last login timestamp"""
+        await self.db.execute(_STMT_RECORD_LOGIN, {"uid": user.id, "ts": now})
         await self.db.commit()
     
     async def deactivate_user(self, user_id: UUID) -> bool:
@@ -200,16 +214,15 @@ class AuthService:
         if not user:
             return False, "User not found"
         
-        if not verify_password(old_password, user.hashed_password):
+        if not await averify_password(old_password, user.hashed_password):
             return False, "Current password is incorrect"
         
-        await self.db.execute(
-            update(User).where(User.id == user_id).values(
-                hashed_password=hash_password(new_password),
-                updated_at=datetime.utcnow()
-            )
-        )
+        await self.db.execute(_STMT_CHANGE_PASSWORD, {
+            "uid": user_id,
+            "hashed_password": await ahash_password(new_password),
+            "ts": datetime.utcnow()
+        })
         await self.db.commit()
         
-        logger.info(f"Password changed for user: {user.email}")
+        logger.info("Password changed for user: {}", user.email)
         return True, "Password changed successfully"
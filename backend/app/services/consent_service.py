@@ -0,0 +1,132 @@
+"""
+Consent Log Service
+Batched background writer for consent and audit log records
+"""
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from loguru import logger
+
+from app.database import AsyncSessionLocal
+from app.models.consent_log import ConsentLog
+
+
+class ConsentLogWriter:
+    """
+    Queues consent log records and writes them in batches
+    Request handlers only enqueue; a single background task does the inserts
+    
+    Records wait in memory for up to FLUSH_INTERVAL_SECONDS (or one batch), so a crash
+    or SIGKILL loses whatever is still queued. created_at is stamped when the user acts,
+    not at insert. Records the database keeps rejecting after WRITE_ATTEMPTS are appended
+    to DEAD_LETTER_PATH as JSON lines for replay instead of being dropped
+    """
+    
+    # Flush when this many records are waiting or the interval elapses
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL_SECONDS = 0.2
+    
+    # Failed batch inserts are retried with exponential backoff before falling back to
+    # row-by-row inserts; rows that still fail go to the dead-letter file
+    WRITE_ATTEMPTS = 3
+    RETRY_DELAY_SECONDS = 0.5
+    DEAD_LETTER_PATH = os.path.join("logs", "consent_dead_letter.jsonl")
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background writer has been started"""
+        return self._task is not None
+    
+    def start(self):
+        """Start the background writer (called on application startup)"""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Flush everything still queued and stop the writer (called on shutdown)"""
+        if self._task is None:
+            return
+        
+        # Records ahead of the sentinel are written before the task exits
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+    
+    def enqueue(self, record: Dict[str, Any]):
+        """Queue a consent log record for the next batch"""
+        self._queue.put_nowait(record)
+    
+    async def _run(self):
+        """Drain the queue into batched inserts until the stop sentinel arrives"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + self.FLUSH_INTERVAL_SECONDS
+            
+            while len(batch) < self.BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            
+            await self._write(batch)
+    
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """Insert a batch with bounded retries, then row by row so one bad record can't drop the rest"""
+        for attempt in range(self.WRITE_ATTEMPTS):
+            try:
+                await self._insert(batch)
+                return
+            except Exception as e:
+                error = e
+                if attempt < self.WRITE_ATTEMPTS - 1:
+                    await asyncio.sleep(self.RETRY_DELAY_SECONDS * 2 ** attempt)
+        
+        if len(batch) == 1:
+            self._dead_letter(batch[0], error)
+            return
+        logger.warning(f"Batched consent log insert failed, retrying individually: {error}")
+        
+        for record in batch:
+            try:
+                await self._insert([record])
+            except Exception as e:
+                self._dead_letter(record, e)
+    
+    async def _insert(self, batch: List[Dict[str, Any]]):
+        """Insert consent log rows in one transaction"""
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(ConsentLog), batch)
+            await session.commit()
+    
+    def _dead_letter(self, record: Dict[str, Any], error: Exception):
+        """Keep a consent log record the database wouldn't take, for later replay"""
+        logger.error(f"Failed to write consent log {record.get('action')}, dead-lettered: {error}")
+        try:
+            os.makedirs(os.path.dirname(self.DEAD_LETTER_PATH), exist_ok=True)
+            with open(self.DEAD_LETTER_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Could not dead-letter consent log {record.get('action')}: {e} ({record!r})")
+
+
+# Singleton instance
+consent_log_writer = ConsentLogWriter()
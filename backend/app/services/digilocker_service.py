@@ -3,17 +3,85 @@ DigiLocker Integration Service
 Handles OAuth2 authentication and document fetching from DigiLocker
 DigiLocker API Documentation: https://partners.digitallocker.gov.in/
 """
+import asyncio
+import random
+import re
+import time
+import weakref
 import httpx
 import base64
 import hashlib
 import secrets
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
 from urllib.parse import urlencode
+from cachetools import TLRUCache
+from lxml import etree
 from loguru import logger
 
 from app.config import settings
 
+# Display month names and the date layouts DigiLocker issuers use
+_MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(_MONTH_NAMES, 1)}
+_DMY_RE = re.compile(r'^(\d{1,2})([-/])(\d{1,2})\2(\d{4})$')  # DD-MM-YYYY, DD/MM/YYYY
+_YMD_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')  # YYYY-MM-DD
+_DMONY_RE = re.compile(r'^(\d{1,2})-([A-Za-z]{3})-(\d{4})$')  # DD-Mon-YYYY
+
+
+@lru_cache(maxsize=4096)
+def _format_display_date(date_str: str) -> str:
+    """Convert a date to 'D Mon YYYY', returning the input unchanged if unrecognised"""
+    try:
+        if m := _DMY_RE.match(date_str):
+            parsed = date(int(m.group(4)), int(m.group(3)), int(m.group(1)))
+        elif m := _YMD_RE.match(date_str):
+            parsed = date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        elif (m := _DMONY_RE.match(date_str)) and m.group(2).lower() in _MONTH_NUMBERS:
+            parsed = date(int(m.group(3)), _MONTH_NUMBERS[m.group(2).lower()], int(m.group(1)))
+        else:
+            return date_str
+    except ValueError:  # Out-of-range day or month
+        return date_str
+    
+    return f"{parsed.day} {_MONTH_NAMES[parsed.month - 1]} {parsed.year}"
+
+
+# Hardened parser for issuer-supplied XML: no external entities, DTDs or network access
+_XML_PARSER = etree.XMLParser(
+    resolve_entities=False, no_network=True, load_dtd=False, huge_tree=False
+)
+
+
+class _RequestRateLimiter:
+    """
+    Token bucket limiting outgoing requests per second
+    Shared by all callers in the worker so parallel pulls stay under the API limit
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request token is available"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+                self.last_update = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class DigiLockerService:
     """Service for DigiLocker API integration"""
@@ -40,6 +108,40 @@ class DigiLockerService:
         "INCMC": "income_certificate",
         "COMMC": "community_certificate",
     }
+    # All mapping keys as one alternation so a single scan finds the type code
+    _DOC_TYPE_PATTERN = re.compile("|".join(map(re.escape, DOC_TYPE_MAPPING)))
+    
+    # Outgoing request ceiling for document pulls (requests per second)
+    PULL_RATE_LIMIT = 5
+    
+    # Upstream statuses worth retrying; any other 4xx fails fast
+    RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+    # Failures that happen before the request reaches DigiLocker, safe to retry for any request
+    UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+    MAX_RETRY_DELAY = 30.0
+    
+    # Upper bound on elements flattened from a generic issuer XML document
+    MAX_XML_NODES = 4096
+    
+    # Cached access tokens are treated as expired this many seconds early
+    TOKEN_EXPIRY_BUFFER_SECONDS = 60
+    TOKEN_CACHE_SIZE = 10_000  # Sessions with a cached access token
+    
+    # Parsed data keys that are stored as entities (key -> entity type)
+    _ENTITY_MAPPING = {
+        "full_name": "full_name",
+        "date_of_birth": "date_of_birth",
+        "gender": "gender",
+        "address": "address",
+        "aadhaar_number": "aadhaar_number",
+        "pan_number": "pan_number",
+        "driving_license_number": "driving_license_number",
+        "voter_id_number": "voter_id_number",
+        "father_name": "father_name",
+        "blood_group": "blood_group",
+        "validity_date": "validity_date",
+        "issue_date": "issue_date",
+    }
     
     # Issuer Organization IDs (common issuers)
     ISSUERS = {
@@ -54,6 +156,92 @@ class DigiLockerService:
         self.client_secret = settings.DIGILOCKER_CLIENT_SECRET
         self.redirect_uri = settings.DIGILOCKER_REDIRECT_URI
         self.base_url = self.SANDBOX_URL if settings.DIGILOCKER_SANDBOX else self.BASE_URL
+        self._pull_limiter = _RequestRateLimiter(self.PULL_RATE_LIMIT, self.PULL_RATE_LIMIT)
+        self._client: Optional[httpx.AsyncClient] = None
+        # session key -> (access token, monotonic expiry time); entries drop out at expiry
+        self._token_cache: TLRUCache = TLRUCache(
+            maxsize=self.TOKEN_CACHE_SIZE, ttu=lambda _key, value, _now: value[1], timer=time.monotonic
+        )
+        # Refresh locks live only while some request holds or waits on them
+        self._token_locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client, creating it on first use
+        Reusing one client keeps connections (and TLS sessions) to DigiLocker alive;
+        with HTTP/2 concurrent calls are multiplexed over a single connection
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=settings.DIGILOCKER_HTTP2,
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _request_with_retry(
+        self,
+        method: str,
+        url: str,
+        *,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        idempotent: bool = True,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request, retrying network errors and transient upstream statuses
+        with exponential backoff and jitter (honouring Retry-After when present)
+        
+        Non-idempotent requests (single-use codes and refresh tokens) are only retried
+        when the connection failed before anything was sent
+        
+        Returns the last response; re-raises the network error if every attempt fails
+        """
+        client = self._get_client()
+        
+        for attempt in range(max_retries):
+            is_last_attempt = attempt == max_retries - 1
+            
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if is_last_attempt or not (idempotent or isinstance(e, self.UNSENT_REQUEST_ERRORS)):
+                    raise
+                delay = self._backoff_delay(attempt, base_delay)
+                logger.warning(f"DigiLocker request failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if (
+                    response.status_code not in self.RETRYABLE_STATUS_CODES
+                    or is_last_attempt
+                    or not idempotent
+                ):
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt, base_delay)
+                logger.warning(
+                    f"DigiLocker returned {response.status_code}, retrying in {delay:.1f}s"
+                )
+            
+            await asyncio.sleep(delay)
+    
+    def _backoff_delay(self, attempt: int, base_delay: float) -> float:
+        """Exponential backoff with up to 50% jitter"""
+        return min(self.MAX_RETRY_DELAY, base_delay * 2 ** attempt * (1 + random.random() * 0.5))
+    
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        """Delay requested by the server via Retry-After (seconds form only)"""
+        try:
+            return min(self.MAX_RETRY_DELAY, max(0.0, float(response.headers["Retry-After"])))
+        except (KeyError, ValueError):
+            return None
     
     def generate_code_verifier(self) -> str:
         """Generate PKCE code verifier"""
@@ -61,8 +249,10 @@ class DigiLockerService:
     
     def generate_code_challenge(self, verifier: str) -> str:
         """Generate PKCE code challenge from verifier"""
+        # A SHA-256 digest is 32 bytes, which always encodes to 44 chars
+        # ending in a single '=' pad
         digest = hashlib.sha256(verifier.encode()).digest()
-        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+        return base64.urlsafe_b64encode(digest)[:-1].decode()
     
     def get_authorization_url(self, state: str, code_verifier: str) -> Dict[str, str]:
         """
@@ -126,43 +316,44 @@ class DigiLockerService:
             "Content-Type": "application/x-www-form-urlencoded",
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    token_url,
-                    data=data,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    token_data = response.json()
-                    logger.info("DigiLocker token exchange successful")
-                    return {
-                        "success": True,
-                        "access_token": token_data.get("access_token"),
-                        "refresh_token": token_data.get("refresh_token"),
-                        "token_type": token_data.get("token_type", "Bearer"),
-                        "expires_in": token_data.get("expires_in", 3600),
-                        "digilocker_id": token_data.get("digilocker_id"),
-                        "name": token_data.get("name"),
-                        "dob": token_data.get("dob"),
-                        "gender": token_data.get("gender"),
-                        "eaadhaar": token_data.get("eaadhaar"),
-                    }
-                else:
-                    logger.error(f"DigiLocker token exchange failed: {response.text}")
-                    return {
-                        "success": False,
-                        "error": response.json().get("error_description", "Token exchange failed")
-                    }
-                    
-            except Exception as e:
-                logger.exception(f"DigiLocker token exchange error: {e}")
+        try:
+            response = await self._request_with_retry(
+                "POST",
+                token_url,
+                data=data,
+                headers=headers,
+                timeout=30.0,
+                idempotent=False
+            )
+            
+            if response.status_code == 200:
+                token_data = response.json()
+                logger.info("DigiLocker token exchange successful")
+                return {
+                    "success": True,
+                    "access_token": token_data.get("access_token"),
+                    "refresh_token": token_data.get("refresh_token"),
+                    "token_type": token_data.get("token_type", "Bearer"),
+                    "expires_in": token_data.get("expires_in", 3600),
+                    "digilocker_id": token_data.get("digilocker_id"),
+                    "name": token_data.get("name"),
+                    "dob": token_data.get("dob"),
+                    "gender": token_data.get("gender"),
+                    "eaadhaar": token_data.get("eaadhaar"),
+                }
+            else:
+                logger.error(f"DigiLocker token exchange failed: {response.text}")
                 return {
                     "success": False,
-                    "error": str(e)
+                    "error": response.json().get("error_description", "Token exchange failed")
                 }
+                
+        except Exception as e:
+            logger.exception(f"DigiLocker token exchange error: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
     async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh expired access token"""
@@ -175,29 +366,164 @@ class DigiLockerService:
             "client_secret": self.client_secret,
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    token_url,
-                    data=data,
-                    timeout=30.0
-                )
+        try:
+            response = await self._request_with_retry(
+                "POST",
+                token_url,
+                data=data,
+                timeout=30.0,
+                idempotent=False
+            )
+            
+            if response.status_code == 200:
+                return {"success": True, **response.json()}
+            else:
+                return {"success": False, "error": "Token refresh failed"}
                 
-                if response.status_code == 200:
-                    return {"success": True, **response.json()}
-                else:
-                    return {"success": False, "error": "Token refresh failed"}
-                    
-            except Exception as e:
-                logger.exception(f"Token refresh error: {e}")
-                return {"success": False, "error": str(e)}
-    
-    async def get_issued_documents(self, access_token: str) -> Dict[str, Any]:
+        except Exception as e:
+            logger.exception(f"Token refresh error: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _session_lock(self, session_key: str) -> asyncio.Lock:
+        """Lock serialising token refreshes for one DigiLocker session"""
+        lock = self._token_locks.get(session_key)
+        if lock is None:
+            lock = self._token_locks[session_key] = asyncio.Lock()
+        return lock
+    
+    def cache_access_token(self, session_key: str, access_token: str, expires_in: int):
+        """Remember a freshly issued access token for a session"""
+        self._token_cache[session_key] = (access_token, time.monotonic() + expires_in)
+    
+    def invalidate_token(self, session_key: str):
+        """Forget the cached access token (e.g. after DigiLocker rejects it)"""
+        self._token_cache.pop(session_key, None)
+    
+    async def get_valid_token(
+        self,
+        session_key: str,
+        refresh_token: Optional[str],
+        stored_token: Optional[str] = None,
+        stored_expires_at: Optional[datetime] = None
+    ) -> Optional[str]:
+        """
+        Get an access token that is not about to expire
+        
+        Args:
+            session_key: Key identifying the DigiLocker session (the user ID, never a credential)
+            refresh_token: Refresh token used when no valid token is known
+            stored_token: Token persisted for the user, used to seed an empty cache
+            stored_expires_at: Expiry (naive UTC) of the persisted token
+            
+        Returns:
+            Access token, or None if the session can no longer be refreshed
+        """
+        cached = self._token_cache.get(session_key)
+        if cached and cached[1] - time.monotonic() > self.TOKEN_EXPIRY_BUFFER_SECONDS:
+            return cached[0]
+        
+        # One refresh per session at a time; concurrent callers reuse its result
+        async with self._session_lock(session_key):
+            cached = self._token_cache.get(session_key)
+            if cached and cached[1] - time.monotonic() > self.TOKEN_EXPIRY_BUFFER_SECONDS:
+                return cached[0]
+            
+            if stored_token and stored_expires_at is None:
+                # No known expiry: use it as-is and let DigiLocker decide
+                return stored_token
+            
+            if stored_token:
+                remaining = (stored_expires_at - datetime.utcnow()).total_seconds()
+                if remaining > self.TOKEN_EXPIRY_BUFFER_SECONDS:
+                    self.cache_access_token(session_key, stored_token, int(remaining))
+                    return stored_token
+            
+            if not refresh_token:
+                return None
+            
+            result = await self.refresh_access_token(refresh_token)
+            if not result.get("success") or not result.get("access_token"):
+                self.invalidate_token(session_key)
+                return None
+            
+            self.cache_access_token(
+                session_key, result["access_token"], result.get("expires_in", 3600)
+            )
+            return result["access_token"]
+    
+    async def _authorized_get(
+        self,
+        url: str,
+        access_token: str,
+        headers: Dict[str, str],
+        timeout: float,
+        session_key: Optional[str] = None,
+        refresh_token: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        GET with a bearer token; on 401 refresh the token and retry exactly once
+        """
+        response = await self._request_with_retry(
+            "GET", url, headers={**headers, "Authorization": f"Bearer {access_token}"}, timeout=timeout
+        )
+        if response.status_code != 401 or not refresh_token:
+            return response
+        
+        new_token = await self._replace_rejected_token(access_token, session_key, refresh_token)
+        if not new_token:
+            return response
+        
+        logger.info("DigiLocker access token rejected, retrying with refreshed token")
+        return await self._request_with_retry(
+            "GET", url, headers={**headers, "Authorization": f"Bearer {new_token}"},
+            timeout=timeout
+        )
+    
+    async def _replace_rejected_token(
+        self, rejected_token: str, session_key: Optional[str], refresh_token: str
+    ) -> Optional[str]:
+        """
+        Get a new access token after DigiLocker rejected one
+        Refreshes under the session lock, so concurrent 401s on one session share a
+        single refresh instead of spending the refresh token several times
+        """
+        if not session_key:
+            refreshed = await self.refresh_access_token(refresh_token)
+            return refreshed.get("access_token") if refreshed.get("success") else None
+        
+        async with self._session_lock(session_key):
+            # Another request may already have replaced the rejected token
+            cached = self._token_cache.get(session_key)
+            if (
+                cached
+                and cached[0] != rejected_token
+                and cached[1] - time.monotonic() > self.TOKEN_EXPIRY_BUFFER_SECONDS
+            ):
+                return cached[0]
+            
+            self.invalidate_token(session_key)
+            refreshed = await self.refresh_access_token(refresh_token)
+            if not refreshed.get("success") or not refreshed.get("access_token"):
+                return None
+            
+            self.cache_access_token(
+                session_key, refreshed["access_token"], refreshed.get("expires_in", 3600)
+            )
+            return refreshed["access_token"]
+    
+    async def get_issued_documents(
+        self,
+        access_token: str,
+        session_key: Optional[str] = None,
+        refresh_token: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Fetch list of documents issued to user in DigiLocker
         
         Args:
             access_token: Valid DigiLocker access token
+            session_key: Token cache key, updated if the token gets refreshed
+            refresh_token: Used to retry once if the access token is rejected
             
         Returns:
             List of issued documents with metadata
@@ -205,61 +531,63 @@ class DigiLockerService:
         url = f"{self.base_url}{self.ISSUED_DOCS_URL}"
         
         headers = {
-            "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=30.0)
+        try:
+            response = await self._authorized_get(
+                url, access_token, headers, 30.0, session_key, refresh_token
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                documents = data.get("items", [])
+                
+                # Process and categorize documents
+                processed_docs = []
+                for doc in documents:
+                    doc_info = self._process_document_info(doc)
+                    if doc_info:
+                        processed_docs.append(doc_info)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    documents = data.get("items", [])
-                    
-                    # Process and categorize documents
-                    processed_docs = []
-                    for doc in documents:
-                        doc_info = self._process_document_info(doc)
-                        if doc_info:
-                            processed_docs.append(doc_info)
-                    
-                    logger.info(f"Fetched {len(processed_docs)} documents from DigiLocker")
-                    return {
-                        "success": True,
-                        "documents": processed_docs,
-                        "total": len(processed_docs)
-                    }
-                else:
-                    logger.error(f"Failed to fetch documents: {response.text}")
-                    return {
-                        "success": False,
-                        "error": "Failed to fetch documents",
-                        "documents": []
-                    }
-                    
-            except Exception as e:
-                logger.exception(f"Error fetching documents: {e}")
+                logger.info(f"Fetched {len(processed_docs)} documents from DigiLocker")
+                return {
+                    "success": True,
+                    "documents": processed_docs,
+                    "total": len(processed_docs)
+                }
+            else:
+                logger.error(f"Failed to fetch documents: {response.text}")
                 return {
                     "success": False,
-                    "error": str(e),
+                    "error": "Failed to fetch documents",
                     "documents": []
                 }
+                
+        except Exception as e:
+            logger.exception(f"Error fetching documents: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "documents": []
+            }
     
     def _process_document_info(self, doc: Dict) -> Optional[Dict]:
         """Process raw document info from DigiLocker"""
         uri = doc.get("uri", "")
-        doc_type = doc.get("doctype", "")
         
-        # Map to our document types
-        our_type = None
-        for dl_type, our_doc_type in self.DOC_TYPE_MAPPING.items():
-            if dl_type in doc_type.upper() or dl_type in uri.upper():
-                our_type = our_doc_type
-                break
+        # Entries without a URI cannot be pulled; skip them before any mapping work
+        if not uri:
+            return None
         
-        if not our_type:
-            our_type = "other"
+        doc_type = doc.get("doctype", "")
+        
+        # Map to our document types (doctype field first, then the URI)
+        match = (
+            self._DOC_TYPE_PATTERN.search(doc_type.upper())
+            or self._DOC_TYPE_PATTERN.search(uri.upper())
+        )
+        our_type = self.DOC_TYPE_MAPPING[match.group()] if match else "other"
         
         return {
             "uri": uri,
@@ -278,7 +606,9 @@ class DigiLockerService:
         self, 
         access_token: str, 
         uri: str,
-        doc_type: str = None
+        doc_type: str = None,
+        session_key: Optional[str] = None,
+        refresh_token: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Pull/download a specific document from DigiLocker
@@ -287,6 +617,8 @@ class DigiLockerService:
             access_token: Valid access token
             uri: Document URI from issued documents list
             doc_type: Optional document type hint
+            session_key: Token cache key, updated if the token gets refreshed
+            refresh_token: Used to retry once if the access token is rejected
             
         Returns:
             Document data with extracted information
@@ -294,40 +626,82 @@ class DigiLockerService:
         url = f"{self.base_url}{self.PULL_DOC_URL}/{uri}"
         
         headers = {
-            "Authorization": f"Bearer {access_token}",
             "Accept": "application/xml, application/pdf, image/*",
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=60.0)
+        try:
+            await self._pull_limiter.acquire()
+            response = await self._authorized_get(
+                url, access_token, headers, 60.0, session_key, refresh_token
+            )
+            
+            if response.status_code == 200:
+                content_type = response.headers.get("content-type", "")
+                
+                # For XML documents (like eAadhaar), parse directly
+                if "xml" in content_type:
+                    return self._parse_xml_document(response.content, doc_type)
+                
+                # For PDF/images, return the raw bytes for further OCR processing;
+                # callers base64-encode only if the payload has to go over JSON
+                return {
+                    "success": True,
+                    "content_type": content_type,
+                    "content": response.content,
+                    "doc_type": doc_type,
+                    "needs_ocr": True
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to pull document: {response.status_code}"
+                }
                 
-                if response.status_code == 200:
-                    content_type = response.headers.get("content-type", "")
-                    
-                    # For XML documents (like eAadhaar), parse directly
-                    if "xml" in content_type:
-                        return await self._parse_xml_document(response.text, doc_type)
-                    
-                    # For PDF/images, return as base64 for further OCR processing
-                    return {
-                        "success": True,
-                        "content_type": content_type,
-                        "data": base64.b64encode(response.content).decode(),
-                        "doc_type": doc_type,
-                        "needs_ocr": True
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to pull document: {response.status_code}"
-                    }
-                    
-            except Exception as e:
-                logger.exception(f"Error pulling document: {e}")
-                return {"success": False, "error": str(e)}
-    
-    async def get_eaadhaar(self, access_token: str) -> Dict[str, Any]:
+        except Exception as e:
+            logger.exception(f"Error pulling document: {e}")
+            return {"success": False, "error": str(e)}
+    
+    async def pull_documents(
+        self,
+        access_token: str,
+        uris: List[Tuple[str, Optional[str]]],
+        concurrency: int = 5,
+        session_key: Optional[str] = None,
+        refresh_token: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Pull several documents in parallel, at most `concurrency` at a time
+        
+        Args:
+            access_token: Valid access token
+            uris: (uri, doc_type) pairs to pull
+            concurrency: Maximum number of pulls in flight
+            session_key: Token cache key, updated if the token gets refreshed
+            refresh_token: Used to retry once if the access token is rejected
+            
+        Returns:
+            One result per input pair, in order; an exception object where a pull raised
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _pull(uri: str, doc_type: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.pull_document(
+                    access_token, uri, doc_type,
+                    session_key=session_key, refresh_token=refresh_token
+                )
+        
+        return await asyncio.gather(
+            *(_pull(uri, doc_type) for uri, doc_type in uris),
+            return_exceptions=True
+        )
+    
+    async def get_eaadhaar(
+        self,
+        access_token: str,
+        session_key: Optional[str] = None,
+        refresh_token: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Fetch eAadhaar XML directly (if consent given)
         This provides structured data without OCR
@@ -335,41 +709,44 @@ class DigiLockerService:
         url = f"{self.base_url}{self.AADHAAR_URL}"
         
         headers = {
-            "Authorization": f"Bearer {access_token}",
             "Accept": "application/xml",
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=headers, timeout=30.0)
+        try:
+            response = await self._authorized_get(
+                url, access_token, headers, 30.0, session_key, refresh_token
+            )
+            
+            if response.status_code == 200:
+                return self._parse_aadhaar_xml_str(response.content)
+            else:
+                return {
+                    "success": False,
+                    "error": "Failed to fetch eAadhaar"
+                }
                 
-                if response.status_code == 200:
-                    return await self._parse_aadhaar_xml(response.text)
-                else:
-                    return {
-                        "success": False,
-                        "error": "Failed to fetch eAadhaar"
-                    }
-                    
-            except Exception as e:
-                logger.exception(f"Error fetching eAadhaar: {e}")
-                return {"success": False, "error": str(e)}
-    
-    async def _parse_xml_document(self, xml_content: str, doc_type: str) -> Dict[str, Any]:
+        except Exception as e:
+            logger.exception(f"Error fetching eAadhaar: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def _parse_xml_document(self, xml_content: bytes, doc_type: str) -> Dict[str, Any]:
         """Parse XML document content based on type"""
-        import xml.etree.ElementTree as ET
-        
         try:
-            root = ET.fromstring(xml_content)
+            root = etree.fromstring(xml_content, _XML_PARSER)
             
             if doc_type == "aadhaar":
-                return await self._parse_aadhaar_xml(xml_content)
+                return self._parse_aadhaar_xml(root)
             
-            # Generic XML parsing
+            # Generic XML parsing (bounded so hostile documents cannot blow up memory)
             data = {}
-            for elem in root.iter():
-                if elem.text and elem.text.strip():
-                    data[elem.tag] = elem.text.strip()
+            for node_count, elem in enumerate(root.iter(etree.Element)):  # Elements only
+                if node_count >= self.MAX_XML_NODES:
+                    logger.warning(
+                        f"XML document exceeds {self.MAX_XML_NODES} elements, remaining nodes ignored"
+                    )
+                    break
+                if elem.text and (text := elem.text.strip()):
+                    data[elem.tag] = text
                 for attr, value in elem.attrib.items():
                     data[f"{elem.tag}_{attr}"] = value
             
@@ -384,17 +761,26 @@ class DigiLockerService:
             logger.error(f"XML parsing error: {e}")
             return {"success": False, "error": "Failed to parse XML"}
     
-    async def _parse_aadhaar_xml(self, xml_content: str) -> Dict[str, Any]:
-        """Parse eAadhaar XML format"""
-        import xml.etree.ElementTree as ET
+    def _parse_aadhaar_xml_str(self, xml_content: bytes) -> Dict[str, Any]:
+        """Parse raw eAadhaar XML content"""
+        try:
+            root = etree.fromstring(xml_content, _XML_PARSER)
+        except etree.XMLSyntaxError as e:
+            logger.error(f"Aadhaar XML parsing error: {e}")
+            return {"success": False, "error": "Failed to parse Aadhaar XML"}
         
+        return self._parse_aadhaar_xml(root)
+    
+    def _parse_aadhaar_xml(self, root: etree._Element) -> Dict[str, Any]:
+        """Extract eAadhaar fields from an already parsed XML root"""
         try:
-            root = ET.fromstring(xml_content)
-            
             # eAadhaar XML has structured format
             # Root element is typically 'OfflinePaperlessKyc' or 'PrintLetterBarcodeData'
             
-            poi = root.find(".//Poi") or root  # Proof of Identity
+            # Proof of Identity (compare with None: attribute-only elements are falsy)
+            poi = root.find(".//Poi")
+            if poi is None:
+                poi = root
             poa = root.find(".//Poa")  # Proof of Address
             
             # Extract attributes
@@ -441,49 +827,21 @@ class DigiLockerService:
     
     def _format_date(self, date_str: str) -> str:
         """Convert date to 'DD Mon YYYY' format"""
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        
-        # Try different formats
-        for fmt in ["%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d", "%d-%b-%Y"]:
-            try:
-                dt = datetime.strptime(date_str, fmt)
-                return f"{dt.day} {month_names[dt.month-1]} {dt.year}"
-            except ValueError:
-                continue
-        
-        return date_str
+        return _format_display_date(date_str)
     
     def _convert_to_entities(self, data: Dict, doc_type: str) -> List[Dict]:
         """Convert parsed data to entity format for storage"""
-        entities = []
-        
-        entity_mapping = {
-            "full_name": "full_name",
-            "date_of_birth": "date_of_birth",
-            "gender": "gender",
-            "address": "address",
-            "aadhaar_number": "aadhaar_number",
-            "pan_number": "pan_number",
-            "driving_license_number": "driving_license_number",
-            "voter_id_number": "voter_id_number",
-            "father_name": "father_name",
-            "blood_group": "blood_group",
-            "validity_date": "validity_date",
-            "issue_date": "issue_date",
-        }
-        
-        for key, value in data.items():
-            if value and key in entity_mapping:
-                entities.append({
-                    "entity_type": entity_mapping[key],
-                    "value": value,
-                    "confidence_score": 1.0,  # High confidence from structured data
-                    "extraction_method": "digilocker_api",
-                    "original_language": "en"
-                })
-        
-        return entities
+        return [
+            {
+                "entity_type": entity_type,
+                "value": data[key],
+                "confidence_score": 1.0,  # High confidence from structured data
+                "extraction_method": "digilocker_api",
+                "original_language": "en"
+            }
+            for key, entity_type in self._ENTITY_MAPPING.items()
+            if data.get(key)
+        ]
 
 
 # Singleton instance
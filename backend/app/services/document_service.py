@@ -2,21 +2,25 @@
 Document Service
 Business logic for document management and data confirmation
 """
+import asyncio
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.orm import aliased, selectinload
 from loguru import logger
 
+from app.database import is_sqlite
 from app.models.document import Document, ExtractedEntity, DocumentType, DocumentStatus, EntityType
 from app.models.consent_log import ConsentLog
 from app.schemas.document import (
     DocumentUploadResponse, ExtractedDataPreview, ExtractedEntityPreview,
     ConfirmDataRequest, EntityUpdate
 )
-from app.services.ocr_service import OCRService
+from app.services.consent_service import consent_log_writer
+from app.services.ocr_service import OCRService, invalidate_cached_results
 from app.utils.security import encrypt_sensitive_data, decrypt_sensitive_data, mask_sensitive_value
 from app.utils.file_utils import delete_temp_file
 
@@ -25,12 +29,50 @@ class DocumentService:
     """Service for document management"""
     
     # Sensitive entity types that need masking
-    SENSITIVE_ENTITIES = {
-        EntityType.AADHAAR_NUMBER,
-        EntityType.PAN_NUMBER,
-        EntityType.VOTER_ID_NUMBER,
-        EntityType.RATION_CARD_NUMBER,
-        EntityType.ANNUAL_INCOME
+    SENSITIVE_ENTITIES = frozenset({
+        EntityType.AADHAAR_NUMBER.value,
+        EntityType.PAN_NUMBER.value,
+        EntityType.VOTER_ID_NUMBER.value,
+        EntityType.RATION_CARD_NUMBER.value,
+        EntityType.ANNUAL_INCOME.value
+    })
+    
+    # Autofill field names mapped to entity types
+    FIELD_MAPPING = {
+        "name": EntityType.FULL_NAME,
+        "full_name": EntityType.FULL_NAME,
+        "dob": EntityType.DATE_OF_BIRTH,
+        "date_of_birth": EntityType.DATE_OF_BIRTH,
+        "gender": EntityType.GENDER,
+        "address": EntityType.ADDRESS,
+        "aadhaar": EntityType.AADHAAR_NUMBER,
+        "aadhaar_number": EntityType.AADHAAR_NUMBER,
+        "pan": EntityType.PAN_NUMBER,
+        "pan_number": EntityType.PAN_NUMBER,
+        "voter_id": EntityType.VOTER_ID_NUMBER,
+        "epic_number": EntityType.VOTER_ID_NUMBER,
+        "father_name": EntityType.FATHER_NAME,
+        "community": EntityType.COMMUNITY,
+        "income": EntityType.ANNUAL_INCOME,
+        # Mobile and email will be handled separately from user profile
+        "mobile": None,
+        "mobile_number": None,
+        "phone": None,
+        "phone_number": None,
+        "email": None,
+        "email_id": None,
+        "mail": None,
+    }
+    
+    # Autofill fields that come from user profile (login data)
+    PROFILE_FIELDS = {
+        "mobile": "phone_number",
+        "mobile_number": "phone_number",
+        "phone": "phone_number",
+        "phone_number": "phone_number",
+        "email": "email",
+        "email_id": "email",
+        "mail": "email",
     }
     
     def __init__(self, db: AsyncSession):
@@ -98,34 +140,44 @@ class DocumentService:
                     processed_at=datetime.utcnow()
                 )
             )
-            await self.db.commit()
+            
+            # Encrypt values off the event loop before building the batch
+            encrypted_values = await asyncio.to_thread(
+                lambda: [encrypt_sensitive_data(e["value"]) for e in result["entities"]]
+            )
             
             # Create temporary entity records (not confirmed yet)
-            entity_previews = []
-            for entity_data in result["entities"]:
-                entity = ExtractedEntity(
+            # IDs are assigned client-side so the whole batch goes out in one flush
+            entities = [
+                ExtractedEntity(
+                    id=uuid4(),
                     document_id=document_id,
                     user_id=user_id,
                     entity_type=entity_data["entity_type"].lower(),  # Use lowercase string value
-                    encrypted_value=encrypt_sensitive_data(entity_data["value"]),
+                    encrypted_value=encrypted_value,
                     original_language=entity_data.get("original_language"),
                     confidence_score=str(entity_data.get("confidence_score", 0)),
                     extraction_method=entity_data.get("extraction_method"),
                     is_approved=False  # Not approved until user confirms
                 )
-                self.db.add(entity)
-                await self.db.flush()
-                
-                # Create preview with decrypted value
-                entity_previews.append(ExtractedEntityPreview(
+                for entity_data, encrypted_value in zip(result["entities"], encrypted_values)
+            ]
+            self.db.add_all(entities)
+            
+            # Create previews with plain text values
+            entity_previews = [
+                ExtractedEntityPreview(
                     id=str(entity.id),
                     entity_type=entity.entity_type,
                     value=entity_data["value"],  # Plain text for preview
                     original_language=entity.original_language,
                     confidence_score=float(entity.confidence_score) if entity.confidence_score else None,
                     needs_review=float(entity.confidence_score or 0) < 0.8
-                ))
+                )
+                for entity, entity_data in zip(entities, result["entities"])
+            ]
             
+            # Commit the document results and entity batch in one transaction
             await self.db.commit()
             
             # Delete temp file after processing
@@ -149,6 +201,8 @@ class DocumentService:
             )
             
         except Exception as e:
+            # Discard the uncommitted results before recording the failure
+            await self.db.rollback()
             await self._update_document_status(document_id, "failed", str(e))
             await delete_temp_file(file_path)
             raise
@@ -170,47 +224,61 @@ class DocumentService:
         if document.status != "extracted":
             raise ValueError("Document has not been processed or already confirmed")
         
-        # Process entity updates
-        confirmed_count = 0
-        deleted_count = 0
-        modified_count = 0
-        
-        for entity_update in request.entities:
-            entity_id = UUID(entity_update.entity_id)
-            
-            # Get entity
-            result = await self.db.execute(
-                select(ExtractedEntity).where(
-                    ExtractedEntity.id == entity_id,
-                    ExtractedEntity.user_id == user_id
-                )
+        # Resolve which of the referenced entities belong to this user
+        entity_ids = [UUID(u.entity_id) for u in request.entities]
+        result = await self.db.execute(
+            select(ExtractedEntity.id).where(
+                ExtractedEntity.id.in_(entity_ids),
+                ExtractedEntity.user_id == user_id
             )
-            entity = result.scalar_one_or_none()
-            
-            if not entity:
+        )
+        owned_ids = set(result.scalars().all())
+        
+        # Partition updates so each group is written with one executemany
+        now = datetime.utcnow()
+        deletes = []
+        approves = []
+        modified = []
+        for entity_id, entity_update in zip(entity_ids, request.entities):
+            if entity_id not in owned_ids:
                 continue
             
             if entity_update.delete:
                 # User wants to delete this entity
-                entity.is_deleted = True
-                entity.deleted_at = datetime.utcnow()
-                deleted_count += 1
+                deletes.append({"id": entity_id, "is_deleted": True, "deleted_at": now})
             elif entity_update.is_approved:
-                # User approves this entity
                 if entity_update.new_value:
                     # User modified the value
-                    entity.encrypted_value = encrypt_sensitive_data(entity_update.new_value)
-                    entity.is_user_modified = True
-                    entity.user_modified_at = datetime.utcnow()
-                    modified_count += 1
-                
-                entity.is_approved = True
-                entity.approved_at = datetime.utcnow()
-                confirmed_count += 1
+                    modified.append((entity_id, entity_update.new_value))
+                else:
+                    approves.append({"id": entity_id, "is_approved": True, "approved_at": now})
+        
+        encrypted_values = await asyncio.to_thread(
+            lambda: [encrypt_sensitive_data(value) for _, value in modified]
+        )
+        modifies = [
+            {
+                "id": entity_id,
+                "encrypted_value": encrypted_value,
+                "is_user_modified": True,
+                "user_modified_at": now,
+                "is_approved": True,
+                "approved_at": now
+            }
+            for (entity_id, _), encrypted_value in zip(modified, encrypted_values)
+        ]
+        
+        for rows in (deletes, approves, modifies):
+            if rows:
+                await self.db.execute(update(ExtractedEntity), rows)
+        
+        confirmed_count = len(approves) + len(modifies)
+        deleted_count = len(deletes)
+        modified_count = len(modifies)
         
         # Update document status
         document.status = "confirmed"
-        document.confirmed_at = datetime.utcnow()
+        document.confirmed_at = now
         
         await self.db.commit()
         
@@ -242,67 +310,65 @@ class DocumentService:
     
     async def get_user_profile_data(self, user_id: UUID) -> Dict[str, Any]:
         """Get all confirmed entity data for user"""
-        # Get all confirmed entities
-        result = await self.db.execute(
-            select(ExtractedEntity).where(
+        # Get the most recent confirmed entity of each type and the user's documents
+        result = await self.db.execute(self._latest_entities_stmt(user_id))
+        doc_result = await self.db.execute(
+            select(Document.id, Document.document_type, Document.status, Document.uploaded_at).where(
+                Document.user_id == user_id,
+                Document.is_deleted == False
+            ).order_by(Document.uploaded_at.desc())
+        )
+        last_updated_result = await self.db.execute(
+            select(func.max(ExtractedEntity.updated_at)).where(
                 ExtractedEntity.user_id == user_id,
                 ExtractedEntity.is_approved == True,
                 ExtractedEntity.is_deleted == False
-            ).order_by(ExtractedEntity.created_at.desc())
+            )
         )
-        entities = result.scalars().all()
+        entities = sorted(result.scalars().all(), key=lambda e: e.created_at, reverse=True)
+        documents = doc_result.all()
+        last_updated = last_updated_result.scalar()
         
-        # Get user's documents
-        doc_result = await self.db.execute(
-            select(Document).where(
-                Document.user_id == user_id,
-                Document.is_deleted == False
-            ).order_by(Document.uploaded_at.desc())
+        # Decrypt values off the event loop
+        decrypted_values = await asyncio.to_thread(
+            lambda: [decrypt_sensitive_data(e.encrypted_value) for e in entities]
         )
-        documents = doc_result.scalars().all()
         
-        # Group entities by type, keeping most recent value
+        # Build display values, one entity per type
         grouped_entities = {}
         entity_details = []  # Store full entity details for editing
-        for entity in entities:
+        for entity, decrypted in zip(entities, decrypted_values):
             entity_type = entity.entity_type  # Already a string
-            if entity_type not in grouped_entities:
-                decrypted = decrypt_sensitive_data(entity.encrypted_value)
-                
-                # Check if entity type is sensitive (use string comparison)
-                is_sensitive = entity_type in ['aadhaar_number', 'pan_number', 'voter_id_number', 'ration_card_number', 'annual_income']
-                
-                # Mask sensitive values for display
-                if is_sensitive:
-                    display_value = mask_sensitive_value(decrypted)
-                else:
-                    display_value = decrypted
-                
-                grouped_entities[entity_type] = {
-                    "value": display_value,
-                    "full_value_available": True,
-                    "source_document_id": str(entity.document_id),
-                    "last_updated": entity.updated_at.isoformat() if entity.updated_at else None,
-                    "entity_id": str(entity.id),
-                    "is_editable": True,
-                    "confidence_score": float(entity.confidence_score) if entity.confidence_score else None
-                }
-                
-                entity_details.append({
-                    "id": str(entity.id),
-                    "entity_type": entity_type,
-                    "value": display_value,
-                    "full_value": decrypted,
-                    "is_sensitive": is_sensitive,
-                    "document_id": str(entity.document_id),
-                    "created_at": entity.created_at.isoformat() if entity.created_at else None,
-                    "updated_at": entity.updated_at.isoformat() if entity.updated_at else None
-                })
-        
-        # Find last update time
-        last_updated = None
-        if entities:
-            last_updated = max(e.updated_at for e in entities if e.updated_at)
+            
+            # Check if entity type is sensitive (use string comparison)
+            is_sensitive = entity_type in self.SENSITIVE_ENTITIES
+            
+            # Mask sensitive values for display
+            if is_sensitive:
+                display_value = mask_sensitive_value(decrypted)
+            else:
+                display_value = decrypted
+            
+            grouped_entities[entity_type] = {
+                "value": display_value,
+                "full_value_available": True,
+                "source_document_id": str(entity.document_id),
+                "last_updated": entity.updated_at.isoformat() if entity.updated_at else None,
+                "entity_id": str(entity.id),
+                "is_editable": True,
+                "confidence_score": float(entity.confidence_score) if entity.confidence_score else None
+            }
+            
+            entity_details.append({
+                "id": str(entity.id),
+                "entity_type": entity_type,
+                "value": display_value,
+                "full_value": decrypted,
+                "is_sensitive": is_sensitive,
+                "document_id": str(entity.document_id),
+                "created_at": entity.created_at.isoformat() if entity.created_at else None,
+                "updated_at": entity.updated_at.isoformat() if entity.updated_at else None
+            })
         
         return {
             "user_id": str(user_id),
@@ -328,15 +394,25 @@ class DocumentService:
         Only returns requested fields that user has approved
         Also includes mobile/email from user profile
         """
-        # Get approved entities
-        result = await self.db.execute(
-            select(ExtractedEntity).where(
-                ExtractedEntity.user_id == user_id,
-                ExtractedEntity.is_approved == True,
-                ExtractedEntity.is_deleted == False
+        # Map each requested entity type to the field names asking for it
+        type_to_fields = defaultdict(list)
+        for field in requested_fields:
+            entity_type = self.FIELD_MAPPING.get(field.lower().replace(" ", "_"))
+            if entity_type:
+                type_to_fields[entity_type.value].append(field)
+        
+        # Get approved values for the requested entity types only
+        entities = []
+        if type_to_fields:
+            result = await self.db.execute(
+                select(ExtractedEntity.entity_type, ExtractedEntity.encrypted_value).where(
+                    ExtractedEntity.user_id == user_id,
+                    ExtractedEntity.is_approved == True,
+                    ExtractedEntity.is_deleted == False,
+                    ExtractedEntity.entity_type.in_(list(type_to_fields))
+                )
             )
-        )
-        entities = result.scalars().all()
+            entities = result.all()
         
         # Get user for mobile/email
         from app.models.user import User
@@ -345,65 +421,27 @@ class DocumentService:
         )
         user = user_result.scalar_one_or_none()
         
-        # Map to requested fields
-        field_mapping = {
-            "name": EntityType.FULL_NAME,
-            "full_name": EntityType.FULL_NAME,
-            "dob": EntityType.DATE_OF_BIRTH,
-            "date_of_birth": EntityType.DATE_OF_BIRTH,
-            "gender": EntityType.GENDER,
-            "address": EntityType.ADDRESS,
-            "aadhaar": EntityType.AADHAAR_NUMBER,
-            "aadhaar_number": EntityType.AADHAAR_NUMBER,
-            "pan": EntityType.PAN_NUMBER,
-            "pan_number": EntityType.PAN_NUMBER,
-            "voter_id": EntityType.VOTER_ID_NUMBER,
-            "epic_number": EntityType.VOTER_ID_NUMBER,
-            "father_name": EntityType.FATHER_NAME,
-            "community": EntityType.COMMUNITY,
-            "income": EntityType.ANNUAL_INCOME,
-            # Mobile and email will be handled separately from user profile
-            "mobile": None,
-            "mobile_number": None,
-            "phone": None,
-            "phone_number": None,
-            "email": None,
-            "email_id": None,
-            "mail": None,
-        }
-        
-        # Fields that come from user profile (login data)
-        profile_fields = {
-            "mobile": "phone_number",
-            "mobile_number": "phone_number",
-            "phone": "phone_number",
-            "phone_number": "phone_number",
-            "email": "email",
-            "email_id": "email",
-            "mail": "email",
-        }
-        
         autofill_data = {}
-        entity_map = {e.entity_type: e for e in entities}
         
-        for field in requested_fields:
-            field_lower = field.lower().replace(" ", "_")
-            
-            # Check if this is a profile field (mobile/email)
-            if field_lower in profile_fields and user:
-                profile_attr = profile_fields[field_lower]
-                profile_value = getattr(user, profile_attr, None)
+        # Profile fields (mobile/email) come from the user record
+        if user:
+            for field in requested_fields:
+                profile_attr = self.PROFILE_FIELDS.get(field.lower().replace(" ", "_"))
+                profile_value = getattr(user, profile_attr, None) if profile_attr else None
                 if profile_value:
                     autofill_data[field] = profile_value
-                continue
-            
-            entity_type = field_mapping.get(field_lower)
-            
-            if entity_type and entity_type in entity_map:
-                entity = entity_map[entity_type]
-                autofill_data[field] = decrypt_sensitive_data(entity.encrypted_value)
         
-        return autofill_data
+        # Decrypt each matched entity type once, off the event loop
+        ciphertexts = {row.entity_type: row.encrypted_value for row in entities}
+        plaintexts = await asyncio.to_thread(
+            lambda: [decrypt_sensitive_data(c) for c in ciphertexts.values()]
+        )
+        for entity_type, plaintext in zip(ciphertexts, plaintexts):
+            for field in type_to_fields[entity_type]:
+                autofill_data[field] = plaintext
+        
+        # Keep the response in request order
+        return {field: autofill_data[field] for field in requested_fields if field in autofill_data}
     
     async def delete_field(self, user_id: UUID, field_type: str) -> Dict[str, int]:
         """
@@ -435,25 +473,24 @@ class DocumentService:
         except ValueError:
             raise ValueError("Invalid entity ID format")
         
-        # Get entity
+        # Update entity, the user_id predicate enforces ownership
+        now = datetime.utcnow()
         result = await self.db.execute(
-            select(ExtractedEntity).where(
+            update(ExtractedEntity).where(
                 ExtractedEntity.id == entity_uuid,
                 ExtractedEntity.user_id == user_id,
                 ExtractedEntity.is_deleted == False
-            )
+            ).values(
+                encrypted_value=encrypt_sensitive_data(new_value),
+                is_user_modified=True,
+                user_modified_at=now,
+                updated_at=now
+            ).returning(ExtractedEntity.id)
         )
-        entity = result.scalar_one_or_none()
         
-        if not entity:
+        if result.scalar_one_or_none() is None:
             raise ValueError("Entity not found")
         
-        # Update entity
-        entity.encrypted_value = encrypt_sensitive_data(new_value)
-        entity.is_user_modified = True
-        entity.user_modified_at = datetime.utcnow()
-        entity.updated_at = datetime.utcnow()
-        
         await self.db.commit()
         
         logger.info(f"Updated entity {entity_id} for user {user_id}")
@@ -471,20 +508,17 @@ class DocumentService:
         except ValueError:
             raise ValueError("Invalid entity ID format")
         
-        # Get entity
+        # Delete entity, the user_id predicate enforces ownership
         result = await self.db.execute(
-            select(ExtractedEntity).where(
+            delete(ExtractedEntity).where(
                 ExtractedEntity.id == entity_uuid,
                 ExtractedEntity.user_id == user_id
-            )
+            ).returning(ExtractedEntity.id)
         )
-        entity = result.scalar_one_or_none()
         
-        if not entity:
+        if result.scalar_one_or_none() is None:
             raise ValueError("Entity not found")
         
-        # Delete entity
-        await self.db.delete(entity)
         await self.db.commit()
         
         logger.info(f"Deleted entity {entity_id} for user {user_id}")
@@ -497,19 +531,42 @@ class DocumentService:
         Returns count of deleted items
         """
         try:
-            # Delete entities first (they reference documents)
-            entity_result = await self.db.execute(
-                delete(ExtractedEntity).where(ExtractedEntity.user_id == user_id)
+            # Cached OCR results for these files go too
+            hash_result = await self.db.execute(
+                select(Document.file_hash).where(Document.user_id == user_id)
             )
-            entity_count = entity_result.rowcount
+            file_hashes = hash_result.scalars().all()
             
-            # Delete documents
-            doc_result = await self.db.execute(
-                delete(Document).where(Document.user_id == user_id)
-            )
-            doc_count = doc_result.rowcount
+            if is_sqlite:
+                # Delete entities first (they reference documents)
+                entity_result = await self.db.execute(
+                    delete(ExtractedEntity).where(ExtractedEntity.user_id == user_id)
+                )
+                entity_count = entity_result.rowcount
+                
+                # Delete documents
+                doc_result = await self.db.execute(
+                    delete(Document).where(Document.user_id == user_id)
+                )
+                doc_count = doc_result.rowcount
+            else:
+                # Delete entities and documents in one statement via data-modifying CTEs
+                deleted_entities = delete(ExtractedEntity).where(
+                    ExtractedEntity.user_id == user_id
+                ).returning(ExtractedEntity.id).cte("deleted_entities")
+                deleted_documents = delete(Document).where(
+                    Document.user_id == user_id
+                ).returning(Document.id).cte("deleted_documents")
+                result = await self.db.execute(
+                    select(
+                        select(func.count()).select_from(deleted_entities).scalar_subquery(),
+                        select(func.count()).select_from(deleted_documents).scalar_subquery()
+                    )
+                )
+                entity_count, doc_count = result.one()
             
             await self.db.commit()
+            invalidate_cached_results(file_hashes)
             
             # Log deletion consent (after successful deletion)
             try:
@@ -531,6 +588,30 @@ class DocumentService:
             await self.db.rollback()
             raise
     
+    def _latest_entities_stmt(self, user_id: UUID):
+        """Select the newest approved, live entity of each type for a user"""
+        filters = (
+            ExtractedEntity.user_id == user_id,
+            ExtractedEntity.is_approved == True,
+            ExtractedEntity.is_deleted == False
+        )
+        
+        if not is_sqlite:
+            return select(ExtractedEntity).where(*filters).order_by(
+                ExtractedEntity.entity_type, ExtractedEntity.created_at.desc()
+            ).distinct(ExtractedEntity.entity_type)
+        
+        # SQLite has no DISTINCT ON, rank rows per type instead
+        ranked = select(
+            ExtractedEntity,
+            func.row_number().over(
+                partition_by=ExtractedEntity.entity_type,
+                order_by=ExtractedEntity.created_at.desc()
+            ).label("rank")
+        ).where(*filters).subquery()
+        latest = aliased(ExtractedEntity, ranked)
+        return select(latest).where(ranked.c.rank == 1)
+    
     async def get_document(self, document_id: UUID, user_id: UUID) -> Optional[Document]:
         """Get document by ID for specific user"""
         result = await self.db.execute(
@@ -566,14 +647,22 @@ class DocumentService:
         additional_data: Dict = None
     ):
         """Log consent action"""
-        log = ConsentLog(
-            user_id=user_id,
-            action=action,
-            consent_given=consent_given,
-            consent_text=consent_text,
-            document_id=document_id,
-            target_website=target_website,
-            additional_data=additional_data
-        )
-        self.db.add(log)
+        record = {
+            "user_id": user_id,
+            "action": action,
+            "consent_given": consent_given,
+            "consent_text": consent_text,
+            "document_id": document_id,
+            "target_website": target_website,
+            "additional_data": additional_data,
+            # Time of the user's action, not of the (possibly batched) insert
+            "created_at": datetime.utcnow()
+        }
+        
+        # Hand off to the batched writer; write inline when it isn't running (e.g. scripts)
+        if consent_log_writer.running:
+            consent_log_writer.enqueue(record)
+            return
+        
+        self.db.add(ConsentLog(**record))
         await self.db.commit()
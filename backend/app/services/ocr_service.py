@@ -2,11 +2,20 @@
 OCR Service
 Image preprocessing, OCR processing, and entity extraction
 """
+import asyncio
+import hashlib
+import os
 import re
+import shlex
+import tempfile
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Optional, Any
 from datetime import datetime
+from cachetools import TTLCache
 
 # OpenCV is optional - use PIL for basic processing if not available
 try:
@@ -18,7 +27,6 @@ except ImportError:
     
 import pytesseract
 from PIL import Image, ImageFilter, ImageOps
-from langdetect import detect, DetectorFactory
 from loguru import logger
 
 from app.config import settings
@@ -31,13 +39,101 @@ try:
 except ImportError:
     PDF_SUPPORT = False
 
-# Ensure consistent language detection
-DetectorFactory.seed = 0
+# In-process Tesseract bindings are optional - fall back to the pytesseract CLI wrapper
+try:
+    from tesserocr import PyTessBaseAPI  # type: ignore
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Aho-Corasick keyword matching is optional - fall back to a regex alternation
+try:
+    import ahocorasick  # type: ignore
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Set Tesseract command path
 pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
 
 
+def _tesserocr_init_args(config: str) -> Dict[str, Any]:
+    """Translate the Tesseract CLI flags in OCR_TESSERACT_CONFIG into PyTessBaseAPI arguments"""
+    args: Dict[str, Any] = {"variables": {}}
+    tokens = iter(shlex.split(config))
+    for token in tokens:
+        if token == "--oem":
+            args["oem"] = int(next(tokens))
+        elif token == "--psm":
+            args["psm"] = int(next(tokens))
+        elif token == "-c":
+            key, _, value = next(tokens).partition("=")
+            args["variables"][key] = value
+        else:
+            # -l is passed per call, the rest have no PyTessBaseAPI equivalent
+            if token in ("-l", "--dpi", "--tessdata-dir", "--user-words", "--user-patterns"):
+                token = f"{token} {next(tokens, '')}".strip()
+            logger.warning(f"OCR_TESSERACT_CONFIG flag {token!r} is ignored by tesserocr")
+    return args
+
+
+def _build_automaton(words: List[str]) -> Any:
+    """Aho-Corasick automaton over lowercase words (None without pyahocorasick)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+# Same 3x3 kernel as PIL's ImageFilter.SHARPEN, for the OpenCV preprocessing path
+if CV2_AVAILABLE:
+    _SHARPEN_KERNEL = np.array(
+        [[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32
+    ) / 16
+
+# Pages are OCR'd in parallel; Tesseract runs as a subprocess (or in tesserocr, which
+# releases the GIL while recognising) so threads don't contend on the GIL
+OCR_WORKERS = settings.OCR_WORKERS or os.cpu_count() or 1
+_ocr_executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+
+# tesserocr engines aren't thread-safe, so each OCR thread keeps its own, one per language
+_TESSEROCR_INIT_ARGS = _tesserocr_init_args(settings.OCR_TESSERACT_CONFIG)
+_tesseract_apis = threading.local()
+
+# Successful OCR results keyed by file SHA-256, document type and OCR engine settings,
+# so a retry or re-upload of the same file skips Tesseract. Entries hold raw text and
+# extracted values, so they only live a few minutes and are dropped when the document goes
+_RESULT_CACHE: TTLCache = TTLCache(maxsize=256, ttl=600)
+
+
+def _tesseract_version() -> Optional[str]:
+    """Installed Tesseract version for the result cache key (None if it can't be read)"""
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def invalidate_cached_results(file_hashes: Iterable[str]) -> None:
+    """Drop cached OCR results for the given file SHA-256 digests"""
+    file_hashes = set(file_hashes)
+    for key in [key for key in list(_RESULT_CACHE.keys()) if key[0] in file_hashes]:
+        _RESULT_CACHE.pop(key, None)
+
+
+class LineIndex(NamedTuple):
+    """Anchors and name candidates found in one pass over the OCR lines"""
+    text_lower: str        # Whole text lowercased once, for the folded patterns
+    lines: List[str]       # Stripped lines
+    dob_idx: int           # Last line with a DOB label (-1 if none)
+    pan_idx: int           # Last PAN header line (-1 if none)
+    to_idx: int            # First bare "To" line (-1 if none)
+    name_idxs: List[int]   # Letters-only lines without government keywords
+
+
 class OCRService:
     """Service for OCR processing and entity extraction"""
     
@@ -51,6 +147,16 @@ class OCRService:
         "ml": "mal"
     }
     
+    # 128-codepoint Unicode block (ord >> 7) of each supported script, for language detection
+    SCRIPT_BLOCK_LANGS = {
+        0x00: "en",  # Basic Latin
+        0x12: "hi",  # Devanagari
+        0x17: "ta",  # Tamil
+        0x18: "te",  # Telugu
+        0x19: "kn",  # Kannada
+        0x1A: "ml",  # Malayalam
+    }
+    
     # Entity extraction patterns
     ENTITY_PATTERNS = {
         EntityType.AADHAAR_NUMBER: [
@@ -176,16 +282,203 @@ class OCRService:
         'election', 'commission', 'voter', 'electoral', 'photo', 'identity',
         'card', 'elector', 'epic', 'roll', 'polling', 'station', 'booth'
     ]
+    # All skip words in one automaton (or one alternation), so a lowercased candidate is scanned once
+    SKIP_NAME_AUTOMATON = _build_automaton(SKIP_NAME_WORDS)
+    SKIP_NAME_PATTERN = re.compile('|'.join(map(re.escape, SKIP_NAME_WORDS)))
+    
+    # Columns of Tesseract's TSV output (same keys as pytesseract's image_to_data dict)
+    TSV_COLUMNS = (
+        'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+        'left', 'top', 'width', 'height', 'conf', 'text'
+    )
+    
+    # First-pass PDF renders below this confidence are re-rendered at PDF_DPI_MAX
+    RERENDER_CONFIDENCE = 0.6
+    
+    # Pixels darker than this count as page content when trimming blank margins
+    CONTENT_THRESHOLD = 200
+    CONTENT_MARGIN = 10
+    
+    # Single words (lowercase) that are labels or OCR noise, never a name
+    NAME_LINE_SKIP_WORDS = frozenset(['name', 'to', 'from', 'signature', 'sign'])
+    FATHER_MATCH_SKIP_WORDS = frozenset(['name', 'male', 'female', 'date'])
+    FATHER_LINE_SKIP_WORDS = frozenset(['name', 'male', 'female', 'date', 'are'])
+    
+    # A line made up only of letters, spaces and dots
+    NAME_LINE_PATTERN = re.compile(r'^[A-Za-z\s\.]+$')
+    # S/O, D/O, W/O, C/O relation prefixes
+    RELATION_PREFIX_PATTERN = re.compile(r'^[SDWC]/O\s', re.IGNORECASE)
+    
+    # Name plausibility: lowercase vowels -> 'V', consonants -> 'C' (other characters unchanged)
+    LETTER_CLASS_TABLE = str.maketrans('aeioubcdfghjklmnpqrstvwxyz', 'V' * 5 + 'C' * 21)
+    CONSONANT_RUN = 'C' * 5  # More than 4 consonants in a row
+    # ASCII tokens in one translate: upper/lower vowel (A/v), upper/lower consonant (B/c), digit (D), other (P)
+    TOKEN_CLASS_TABLE = {
+        **dict.fromkeys(range(128), 'P'),
+        **str.maketrans(
+            'AEIOUBCDFGHJKLMNPQRSTVWXYZaeioubcdfghjklmnpqrstvwxyz0123456789',
+            'A' * 5 + 'B' * 21 + 'v' * 5 + 'c' * 21 + 'D' * 10
+        ),
+    }
+    # 'ufwe' is left out: any string containing it already matches 'fw'
+    UNUSUAL_LETTERS_PATTERN = re.compile(r'fw|wf|guf|weni|nise')
+    GARBAGE_RUN_PATTERN = re.compile(r'(.)\1\1|[aeiou]{4}', re.IGNORECASE)
+    # Real name tokens the garbage rules would otherwise reject: generation suffixes
+    # (II, III, VIII) repeat a letter, and Mc/Mac/O' surnames are often capitalised after the prefix
+    ROMAN_NUMERAL_PATTERN = re.compile(r'X{0,3}(?:IX|IV|V?I{0,3})\.?', re.IGNORECASE)
+    SURNAME_PREFIX_PATTERN = re.compile(r"(?:Mc|Mac|O')(?=[A-Z])")
+    
+    # PAN OCR fixes: digits misread in letter positions (rarely needed but can happen)
+    PAN_DIGIT_TO_LETTER = str.maketrans({'0': 'O', '1': 'I', '8': 'B'})
+    # ...and common letter misreads in the digit positions
+    PAN_LETTER_TO_DIGIT = str.maketrans({
+        'S': '8', 'B': '8',
+        'O': '0', 'Q': '0', 'D': '0',
+        'I': '1', 'L': '1', 'J': '1',
+        'Z': '2',
+        'E': '3',
+        'A': '4', 'H': '4',
+        'G': '6',
+        'T': '7',
+        'P': '9',  # P can look like 9
+        'R': '2',  # R can look like 2
+    })
     
-    # Address keywords for extraction
+    # Helper patterns used while validating and cleaning extracted values
+    WHITESPACE_PATTERN = re.compile(r'\s')
+    WHITESPACE_RUN_PATTERN = re.compile(r'\s+')
+    # Trailing comma (dropped) or whitespace run (collapsed to one space), fixed in one pass
+    ADDRESS_CLEANUP_PATTERN = re.compile(r',\s*$|\s+')
+    FOUR_DIGITS_PATTERN = re.compile(r'\d{4}')
+    PINCODE_PATTERN = re.compile(r'\b(\d{6})\b')
+    # Callers gate this on cleaned[0].isdigit(), which rejects most address lines without a regex call
+    AADHAAR_LINE_PATTERN = re.compile(r'^\d{4}\s?\d{4}\s?\d{4}$')
+    PAN_LIKE_PATTERN = re.compile(r'[A-Z]{5}[0-9O]{4}[A-Z]')
+    PAN_FORMAT_PATTERN = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]$')
+    INCOME_STRIP_PATTERN = re.compile(r'[₹Rs\.\s,]')
+    DL_SEPARATOR_PATTERN = re.compile(r'[\s\-/]')
+    # DD/MM/YYYY or YYYY/MM/DD (any of / - . as separator) in one pattern
+    DATE_PATTERN = re.compile(
+        r'(?P<d1>\d{2})[/\-\.](?P<m1>\d{2})[/\-\.](?P<y1>\d{4})'
+        r'|(?P<y2>\d{4})[/\-\.](?P<m2>\d{2})[/\-\.](?P<d2>\d{2})'
+    )
+    # The DOB formats accepted by _calculate_confidence (%d/%m/%Y, %d-%m-%Y, %d.%m.%Y, %Y-%m-%d)
+    # as one fullmatch pattern, using strptime's own field syntax
+    DOB_FORMAT_PATTERN = re.compile(
+        r'(?P<d1>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])(?P<sep>[/\-.])(?P<m1>1[0-2]|0[1-9]|[1-9])(?P=sep)(?P<y1>\d{4})'
+        r'|(?P<y2>\d{4})-(?P<m2>1[0-2]|0[1-9]|[1-9])-(?P<d2>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])'
+    )
+    MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                   'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+    # Written-out signs and whitespace in blood groups, rewritten in one substitution pass
+    BLOOD_GROUP_SUB_PATTERN = re.compile(r'POSITIVE|POS|NEGATIVE|NEG|\s+')
+    BLOOD_GROUP_SIGNS = {'POSITIVE': '+', 'POS': '+', 'NEGATIVE': '-', 'NEG': '-'}
+    VALID_BLOOD_GROUPS = frozenset(['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-'])
+    
+    # Address keywords for extraction (lowercase, in priority order)
     ADDRESS_KEYWORDS = [
         "address", "पता", "முகவரி", "చిరునామా", "ವಿಳಾಸ", "വിലാസം",
         "s/o", "d/o", "w/o", "c/o", "house", "street", "road", "lane",
         "district", "state", "pin", "pincode"
     ]
+    # Case-insensitive keyword searches for when no lowercased text lines up with the original
+    ADDRESS_KEYWORD_PATTERNS = [re.compile(re.escape(k), re.IGNORECASE) for k in ADDRESS_KEYWORDS]
+    
+    # Entities to extract per document type, in extraction order
+    # Both English and regional names are extracted for storage
+    DOCUMENT_ENTITY_TYPES = {
+        DocumentType.AADHAAR: (
+            EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
+            EntityType.GENDER, EntityType.ADDRESS, EntityType.AADHAAR_NUMBER, EntityType.FATHER_NAME
+        ),
+        DocumentType.PAN: (
+            EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
+            EntityType.PAN_NUMBER, EntityType.FATHER_NAME
+        ),
+        DocumentType.VOTER_ID: (
+            EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
+            EntityType.GENDER, EntityType.ADDRESS, EntityType.VOTER_ID_NUMBER, EntityType.FATHER_NAME
+        ),
+        DocumentType.RATION_CARD: (
+            EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.ADDRESS, 
+            EntityType.RATION_CARD_NUMBER
+        ),
+        DocumentType.COMMUNITY_CERTIFICATE: (
+            EntityType.FULL_NAME, EntityType.COMMUNITY, EntityType.CERTIFICATE_ISSUE_DATE,
+            EntityType.FATHER_NAME
+        ),
+        DocumentType.INCOME_CERTIFICATE: (
+            EntityType.FULL_NAME, EntityType.ANNUAL_INCOME, EntityType.CERTIFICATE_ISSUE_DATE,
+            EntityType.ADDRESS
+        ),
+        DocumentType.DRIVING_LICENSE: (
+            EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH,
+            EntityType.ADDRESS, EntityType.DRIVING_LICENSE_NUMBER, EntityType.BLOOD_GROUP,
+            EntityType.ORGAN_DONOR, EntityType.VALIDITY_DATE, EntityType.ISSUE_DATE,
+            EntityType.FATHER_NAME
+        )
+    }
+    
+    # Patterns compiled once at class load; extraction only runs the compiled objects.
+    # They are lowercased and matched case-sensitively against the lowercased text
+    # (see _search_value): same matches as IGNORECASE, but re keeps its literal fast paths
+    COMPILED_ENTITY_PATTERNS = {
+        entity_type: [re.compile(p.lower(), re.MULTILINE) for p in patterns]
+        for entity_type, patterns in ENTITY_PATTERNS.items()
+    }
+    COMPILED_NAME_PATTERNS = {
+        lang: [re.compile(p.lower(), re.MULTILINE) for p in patterns]
+        for lang, patterns in NAME_PATTERNS.items()
+    }
+    
+    # Father/husband name label patterns (lowercased like the ones above)
+    FATHER_NAME_PATTERNS = [
+        re.compile(p.lower(), re.MULTILINE) for p in [
+            # Voter ID specific patterns
+            r"(?:Father(?:'s)?[\s/|]*Name|Fatver(?:'s)?[\s/|]*Name)[:\s|]*\n?([A-Z][A-Za-z\s\.]+?)(?:\n|$)",
+            r"(?:Husband(?:'s)?[\s/|]*Name)[:\s|]*\n?([A-Z][A-Za-z\s\.]+?)(?:\n|$)",
+            # PAN Card patterns
+            r"(?:Father's Name|FATHER'S NAME|Father Name)[:\s]*\n?([A-Z][A-Z\s]+?)(?:\n|Date|DOB|$)",
+            r"(?:S/O|D/O|Son of|Daughter of|W/O|Wife of)[:\s]*([A-Za-z\s\.]+?)(?:\n|$)",
+            # Hindi patterns
+            r"(?:पिता का नाम|पिता)[:\s]*(.+?)(?:\n|$)",
+        ]
+    ]
+    
+    # Driving licence positional heuristics
+    # Label gaps exclude newlines so a single scan over the whole text stays line-local
+    DL_LABEL_PATTERN = re.compile(r'(DL[^\S\n]*No|License[^\S\n]*No|Driving[^\S\n]*Licen[cs]e|D\.L\.|Licence[^\S\n]*No)', re.IGNORECASE)
+    DL_TOKEN_PATTERN = re.compile(r'([A-Z]{2}[\s\-]?\d{2,4}[\s\-]?\d{4,}[\s\-]?\d*)')
+    DL_FALLBACK_PATTERN = re.compile(r'\b([A-Z]{2}\d{2}[\s\-]?\d{4}[\s\-]?\d{5,7})\b')
+    
+    # Regional scripts by Unicode block
+    REGIONAL_SCRIPTS = {
+        'tamil': '\u0B80-\u0BFF',
+        'hindi': '\u0900-\u097F',
+        'telugu': '\u0C00-\u0C7F',
+        'kannada': '\u0C80-\u0CFF',
+        'malayalam': '\u0D00-\u0D7F',
+    }
+    # One alternation finds the runs of every script in a single pass; lastgroup names the script
+    REGIONAL_SCRIPT_PATTERN = re.compile(
+        '|'.join(f'(?P<{lang}>[{block}]+)' for lang, block in REGIONAL_SCRIPTS.items())
+    )
+    # Common Hindi words like भारत (India), सरकार (Government) that are never the holder's name
+    REGIONAL_SKIP_WORDS = frozenset([
+        'भारत', 'सरकार', 'आधार', 'पुरुष', 'महिला', 'पता', 'जन्म', 'तिथि',
+        'विशिष्ट', 'पहचान', 'प्राधिकरण', 'मेरा', 'मेरी', 'आयकर', 'विभाग'
+    ])
     
     def __init__(self):
         self.supported_languages = list(self.LANG_CODES.keys())
+        # Entity types with a dedicated extractor; the rest use ENTITY_PATTERNS
+        self._extractors = {
+            EntityType.FULL_NAME: self._extract_name,
+            EntityType.FULL_NAME_REGIONAL: self._extract_regional_name,
+            EntityType.ADDRESS: self._extract_address,
+            EntityType.FATHER_NAME: self._extract_father_name,
+            EntityType.DRIVING_LICENSE_NUMBER: self._extract_driving_license_number,
+        }
     
     async def process_document(
         self, file_path: str, document_type: DocumentType
@@ -197,6 +490,16 @@ class OCRService:
         start_time = time.time()
         
         try:
+            cache_key = await asyncio.to_thread(self._result_cache_key, file_path, document_type)
+            cached = _RESULT_CACHE.get(cache_key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for {document_type}")
+                return {
+                    **cached,
+                    "entities": [dict(entity) for entity in cached["entities"]],
+                    "processing_time_ms": int((time.time() - start_time) * 1000)
+                }
+            
             # Load and preprocess image(s)
             images = await self._load_document(file_path)
             
@@ -206,22 +509,22 @@ class OCRService:
             # Get appropriate Tesseract language code
             lang_code = self._get_tesseract_lang(detected_lang)
             
-            # Extract text from all pages
-            full_text = ""
-            confidences = []
-            
-            for img in images:
-                # Preprocess image
-                processed = await self._preprocess_image(img)
-                
-                # Run OCR
-                text, confidence = await self._run_ocr(processed, lang_code)
-                full_text += text + "\n"
-                confidences.append(confidence)
+            full_text, avg_confidence = await self._ocr_pages(images, lang_code)
             
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            # Tesseract returns confidence as 0-100, convert to 0-1 range
-            avg_confidence = min(avg_confidence / 100.0, 1.0)
+            # PDFs are rendered at a low DPI first; re-render at full DPI only when OCR struggled
+            if (
+                avg_confidence < self.RERENDER_CONFIDENCE
+                and self._is_pdf(file_path)
+                and settings.PDF_DPI < settings.PDF_DPI_MAX
+            ):
+                logger.info(
+                    f"Low OCR confidence {avg_confidence:.2f} at {settings.PDF_DPI} DPI, "
+                    f"re-rendering at {settings.PDF_DPI_MAX} DPI"
+                )
+                images = await self._load_document(file_path, dpi=settings.PDF_DPI_MAX)
+                retry_text, retry_confidence = await self._ocr_pages(images, lang_code)
+                if retry_confidence >= avg_confidence:
+                    full_text, avg_confidence = retry_text, retry_confidence
             
             # Extract entities based on document type
             logger.info(f"Processing extraction for doc_type: {document_type} ({type(document_type)})")
@@ -229,7 +532,7 @@ class OCRService:
             
             processing_time = int((time.time() - start_time) * 1000)
             
-            return {
+            result = {
                 "success": True,
                 "detected_language": detected_lang,
                 "overall_confidence": round(avg_confidence, 2),
@@ -238,6 +541,10 @@ class OCRService:
                 "processing_time_ms": processing_time,
                 "warnings": self._generate_warnings(entities, avg_confidence)
             }
+            _RESULT_CACHE[cache_key] = {
+                **result, "entities": [dict(entity) for entity in entities]
+            }
+            return result
             
         except Exception as e:
             logger.error(f"OCR processing error: {e}", exc_info=True)
@@ -247,28 +554,82 @@ class OCRService:
                 "processing_time_ms": int((time.time() - start_time) * 1000)
             }
     
-    async def _load_document(self, file_path: str) -> List[Image.Image]:
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        """SHA-256 of the file contents, used as the OCR result cache key"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @classmethod
+    def _result_cache_key(cls, file_path: str, document_type: DocumentType) -> tuple:
+        """
+        Result cache key: file digest first (see invalidate_cached_results), then everything
+        that changes the OCR output for the same file
+        """
+        return (
+            cls._file_digest(file_path),
+            document_type,
+            _tesseract_version(),
+            settings.OCR_TESSERACT_CONFIG,
+            settings.PDF_DPI,
+            settings.PDF_DPI_MAX,
+        )
+    
+    @staticmethod
+    def _is_pdf(file_path: str) -> bool:
+        """Whether the file is a PDF (by extension)"""
+        return Path(file_path).suffix.lower() == '.pdf'
+    
+    async def _load_document(self, file_path: str, dpi: int = settings.PDF_DPI) -> List[Image.Image]:
         """Load document and convert to PIL Images"""
-        path = Path(file_path)
-        
-        if path.suffix.lower() == '.pdf':
+        if self._is_pdf(file_path):
             if not PDF_SUPPORT:
                 raise ValueError("PDF support not available. Install pdf2image.")
             # Convert PDF pages to images
-            pil_images = convert_from_path(file_path, dpi=300)
+            pil_images = convert_from_path(file_path, dpi=dpi, thread_count=OCR_WORKERS)
             return pil_images
         else:
             # Load image file using PIL
             img = Image.open(file_path)
             return [img]
     
-    async def _preprocess_image(self, image: Image.Image) -> Image.Image:
+    async def _ocr_pages(self, images: List[Image.Image], lang_code: str) -> Tuple[str, float]:
+        """OCR all pages in parallel; returns the joined text and average confidence (0-1)"""
+        loop = asyncio.get_running_loop()
+        page_results = await asyncio.gather(*(
+            loop.run_in_executor(_ocr_executor, self._process_page, img, lang_code)
+            for img in images
+        ))
+        full_text = "".join(text + "\n" for text, _ in page_results)
+        confidences = [confidence for _, confidence in page_results]
+        
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+        # Tesseract returns confidence as 0-100, convert to 0-1 range
+        return full_text, min(avg_confidence / 100.0, 1.0)
+    
+    def _process_page(self, image: Image.Image, lang: str) -> Tuple[str, float]:
+        """Preprocess and OCR a single page (runs in the OCR thread pool)"""
+        return self._run_ocr(self._preprocess_image(image), lang)
+    
+    def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """
-        Preprocess image for better OCR accuracy using PIL
+        Preprocess image for better OCR accuracy
+        Uses OpenCV when available, PIL otherwise
         """
+        if CV2_AVAILABLE:
+            return self._preprocess_image_cv2(image)
+        
         # Convert to grayscale
         gray = image.convert('L')
         
+        # Trim blank margins so Tesseract only sees the content area
+        bbox = gray.point(lambda p: 255 if p < self.CONTENT_THRESHOLD else 0).getbbox()
+        if bbox:
+            gray = gray.crop(self._pad_bbox(bbox, gray.size))
+        
         # Resize if too small
         width, height = gray.size
         if width < 1000:
@@ -284,27 +645,83 @@ class OCRService:
         
         return enhanced
     
+    def _preprocess_image_cv2(self, image: Image.Image) -> Image.Image:
+        """Same grayscale/upscale/sharpen/contrast pipeline on NumPy buffers with OpenCV"""
+        gray = np.asarray(image.convert('L'))
+        
+        # Trim blank margins so Tesseract only sees the content area
+        content = cv2.findNonZero((gray < self.CONTENT_THRESHOLD).astype(np.uint8))
+        if content is not None:
+            x, y, w, h = cv2.boundingRect(content)
+            left, top, right, bottom = self._pad_bbox((x, y, x + w, y + h), (gray.shape[1], gray.shape[0]))
+            gray = gray[top:bottom, left:right]
+        
+        # Resize if too small
+        height, width = gray.shape
+        if width < 1000:
+            scale = 1000 / width
+            gray = cv2.resize(
+                gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_CUBIC
+            )
+        
+        # Apply sharpening filter
+        sharpened = cv2.filter2D(gray, -1, _SHARPEN_KERNEL)
+        
+        # Stretch contrast to the full 0-255 range
+        enhanced = cv2.normalize(sharpened, None, 0, 255, cv2.NORM_MINMAX)
+        
+        return Image.fromarray(enhanced)
+    
+    def _pad_bbox(
+        self, bbox: Tuple[int, int, int, int], size: Tuple[int, int]
+    ) -> Tuple[int, int, int, int]:
+        """Grow a (left, top, right, bottom) box by the content margin, clamped to the image"""
+        left, top, right, bottom = bbox
+        width, height = size
+        margin = self.CONTENT_MARGIN
+        return (
+            max(left - margin, 0), max(top - margin, 0),
+            min(right + margin, width), min(bottom + margin, height)
+        )
+    
     async def _detect_language(self, image: Image.Image) -> str:
         """Detect language from image text"""
         try:
             # Quick OCR with English for language detection
-            text = pytesseract.image_to_string(image, lang='eng+hin+tam')
+            if TESSEROCR_AVAILABLE:
+                api = self._tesseract_api('eng+hin+tam')
+                api.SetImage(image)
+                text = api.GetUTF8Text()
+            else:
+                text = pytesseract.image_to_string(
+                    image, lang='eng+hin+tam', config=settings.OCR_TESSERACT_CONFIG
+                )
             
-            if len(text.strip()) > 20:
-                detected = detect(text)
-                return detected if detected in self.supported_languages else "en"
+            return self._detect_script_language(text)
         except:
             pass
         
         return "en"  # Default to English
     
+    def _detect_script_language(self, text: str) -> str:
+        """Pick the language whose script has the most characters in the text"""
+        # Count Latin letters and every non-ASCII character (Indic vowel signs aren't isalpha)
+        blocks = Counter(ord(c) >> 7 for c in text if c.isalpha() or not c.isascii())
+        counts = {
+            lang: blocks[block] for block, lang in self.SCRIPT_BLOCK_LANGS.items() if blocks[block]
+        }
+        
+        if sum(counts.values()) <= 20:
+            return "en"
+        return max(counts, key=counts.get)
+    
     def _get_tesseract_lang(self, detected_lang: str) -> str:
         """Get Tesseract language code"""
         # Always include English for mixed content
         base_lang = self.LANG_CODES.get(detected_lang, "eng")
         return f"{base_lang}+eng" if base_lang != "eng" else "eng"
     
-    async def _run_ocr(
+    def _run_ocr(
         self, image: Image.Image, lang: str
     ) -> Tuple[str, float]:
         """
@@ -312,23 +729,108 @@ class OCRService:
         Returns (text, confidence)
         """
         # Get OCR data with confidence
-        data = pytesseract.image_to_data(
-            image, lang=lang, output_type=pytesseract.Output.DICT
-        )
+        if TESSEROCR_AVAILABLE:
+            data = self._ocr_data_in_process(image, lang)
+        else:
+            # The preprocessed page is grayscale, so it is written once as an
+            # uncompressed PGM rather than letting pytesseract PNG-encode it
+            fd, input_path = tempfile.mkstemp(prefix="ocr_", suffix=".pgm")
+            os.close(fd)
+            try:
+                image.save(input_path, format="PPM")
+                data = pytesseract.image_to_data(
+                    input_path, lang=lang, config=settings.OCR_TESSERACT_CONFIG,
+                    output_type=pytesseract.Output.DICT
+                )
+            finally:
+                os.remove(input_path)
         
         # Calculate average confidence (excluding -1 values)
-        confidences = [int(c) for c in data['conf'] if int(c) > 0]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+        avg_confidence = self._mean_confidence(data['conf'])
         
-        # Get text
-        text = pytesseract.image_to_string(image, lang=lang)
+        # Rebuild the text from the same pass instead of running Tesseract again
+        text = self._text_from_ocr_data(data)
         
-        # Debug logging - log the extracted text
-        logger.info(f"OCR extracted text (lang={lang}):\n{text}")
-        logger.info(f"OCR confidence: {avg_confidence}")
+        # Debug logging - log the extracted text (message only built when DEBUG is enabled)
+        logger.debug("OCR extracted text (lang={}):\n{}", lang, text)
+        logger.debug("OCR confidence: {}", avg_confidence)
         
         return text.strip(), avg_confidence
     
+    def _tesseract_api(self, lang: str) -> "PyTessBaseAPI":
+        """This thread's in-process Tesseract engine for a language, loaded on first use"""
+        apis = getattr(_tesseract_apis, "by_lang", None)
+        if apis is None:
+            apis = _tesseract_apis.by_lang = {}
+        
+        api = apis.get(lang)
+        if api is None:
+            # Language data is loaded once here instead of on every tesseract process launch
+            api = apis[lang] = PyTessBaseAPI(lang=lang, **_TESSEROCR_INIT_ARGS)
+        return api
+    
+    def _ocr_data_in_process(self, image: Image.Image, lang: str) -> Dict[str, List]:
+        """Word-level OCR data via tesserocr, in the same shape as pytesseract's image_to_data"""
+        api = self._tesseract_api(lang)
+        api.SetImage(image)
+        
+        data: Dict[str, List] = {column: [] for column in self.TSV_COLUMNS}
+        for row in api.GetTSVText(0).splitlines():
+            fields = row.split('\t', len(self.TSV_COLUMNS) - 1)
+            if len(fields) < len(self.TSV_COLUMNS):
+                fields.append('')
+            for column, value in zip(self.TSV_COLUMNS, fields):
+                if column == 'text':
+                    data[column].append(value)
+                elif column == 'conf':
+                    data[column].append(float(value))
+                else:
+                    data[column].append(int(value))
+        return data
+    
+    def _mean_confidence(self, confs: List[Any]) -> float:
+        """Mean of the positive per-word Tesseract confidences (0 if none)"""
+        if CV2_AVAILABLE:
+            # Parse once and reduce in NumPy; astype truncates like int()
+            values = np.asarray(confs, dtype=np.float64).astype(np.int64)
+            positive = values[values > 0]
+            return float(positive.mean()) if positive.size else 0
+        
+        confidences = [c for c in map(int, confs) if c > 0]
+        return sum(confidences) / len(confidences) if confidences else 0
+    
+    def _text_from_ocr_data(self, data: Dict[str, List]) -> str:
+        """
+        Reassemble page text from image_to_data word boxes
+        Words are joined per line and paragraphs separated by a blank line,
+        matching the layout image_to_string produces
+        """
+        lines: List[str] = []
+        current_key = None
+        current_par = None
+        words: List[str] = []
+        
+        for i, word in enumerate(data['text']):
+            if data['level'][i] != 5 or not word.strip():
+                continue
+            
+            par_key = (data['page_num'][i], data['block_num'][i], data['par_num'][i])
+            line_key = par_key + (data['line_num'][i],)
+            if line_key != current_key:
+                if words:
+                    lines.append(' '.join(words))
+                    words = []
+                if current_par is not None and par_key != current_par:
+                    lines.append('')
+                current_key = line_key
+                current_par = par_key
+            words.append(word)
+        
+        if words:
+            lines.append(' '.join(words))
+        
+        return '\n'.join(lines)
+    
 
     async def _extract_entities(
         self, text: str, doc_type: DocumentType, language: str
@@ -336,136 +838,41 @@ class OCRService:
         """Extract entities from OCR text based on document type"""
         entities = []
         
-        # Define which entities to extract based on document type
-        # Now extracts both English and regional names for storage
-        entity_map = {
-            DocumentType.AADHAAR: [
-                EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
-                EntityType.GENDER, EntityType.ADDRESS, EntityType.AADHAAR_NUMBER, EntityType.FATHER_NAME
-            ],
-            DocumentType.PAN: [
-                EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
-                EntityType.PAN_NUMBER, EntityType.FATHER_NAME
-            ],
-            DocumentType.VOTER_ID: [
-                EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH, 
-                EntityType.GENDER, EntityType.ADDRESS, EntityType.VOTER_ID_NUMBER, EntityType.FATHER_NAME
-            ],
-            DocumentType.RATION_CARD: [
-                EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.ADDRESS, 
-                EntityType.RATION_CARD_NUMBER
-            ],
-            DocumentType.COMMUNITY_CERTIFICATE: [
-                EntityType.FULL_NAME, EntityType.COMMUNITY, EntityType.CERTIFICATE_ISSUE_DATE,
-                EntityType.FATHER_NAME
-            ],
-            DocumentType.INCOME_CERTIFICATE: [
-                EntityType.FULL_NAME, EntityType.ANNUAL_INCOME, EntityType.CERTIFICATE_ISSUE_DATE,
-                EntityType.ADDRESS
-            ],
-            DocumentType.DRIVING_LICENSE: [
-                EntityType.FULL_NAME, EntityType.FULL_NAME_REGIONAL, EntityType.DATE_OF_BIRTH,
-                EntityType.ADDRESS, EntityType.DRIVING_LICENSE_NUMBER, EntityType.BLOOD_GROUP,
-                EntityType.ORGAN_DONOR, EntityType.VALIDITY_DATE, EntityType.ISSUE_DATE,
-                EntityType.FATHER_NAME
-            ]
-        }
-        
-        target_entities = entity_map.get(doc_type, [EntityType.FULL_NAME])
+        target_entities = self.DOCUMENT_ENTITY_TYPES.get(doc_type, (EntityType.FULL_NAME,))
+        line_index = self._scan_lines(text)
         
         for entity_type in target_entities:
-            extracted = await self._extract_single_entity(text, entity_type, language)
+            extracted = await self._extract_single_entity(text, entity_type, language, line_index)
             if extracted:
                 entities.append(extracted)
         
         return entities
     
     async def _extract_single_entity(
-        self, text: str, entity_type: EntityType, language: str
+        self, text: str, entity_type: EntityType, language: str,
+        line_index: Optional[LineIndex] = None
     ) -> Optional[Dict[str, Any]]:
         """Extract a single entity from text"""
+        if line_index is None:
+            line_index = self._scan_lines(text)
         
-        if entity_type == EntityType.FULL_NAME:
-            return self._extract_name(text, language)
-        
-        if entity_type == EntityType.FULL_NAME_REGIONAL:
-            return self._extract_regional_name(text, language)
-        
-        if entity_type == EntityType.ADDRESS:
-            return self._extract_address(text, language)
+        extractor = self._extractors.get(entity_type)
+        if extractor is not None:
+            return extractor(text, language, line_index)
         
-        if entity_type == EntityType.FATHER_NAME:
-            return self._extract_father_name(text, language)
-        
-        # Special positional fallback for Driving License number
-        if entity_type == EntityType.DRIVING_LICENSE_NUMBER:
-            # First try regex patterns; if none match, use positional heuristics
-            patterns = self.ENTITY_PATTERNS.get(entity_type, [])
-            for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    value = match.group(1).strip()
-                    confidence = self._calculate_confidence(entity_type, value)
-                    return {
-                        "entity_type": entity_type.value,
-                        "value": self._clean_value(value, entity_type),
-                        "original_language": language,
-                        "confidence_score": confidence,
-                        "extraction_method": "regex"
-                    }
-
-            # Positional/keyword-based heuristic: search near DL labels
-            lines = text.split('\n')
-            for i, line in enumerate(lines):
-                l = line.strip()
-                if not l:
-                    continue
-                if re.search(r'(DL\s*No|License\s*No|Driving\s*Licen[cs]e|D\.L\.|Licence\s*No)', l, re.IGNORECASE):
-                    # Check same line for a token that resembles DL number
-                    token_match = re.search(r'([A-Z]{2}[\s\-]?\d{2,4}[\s\-]?\d{4,}[\s\-]?\d*)', l)
-                    if token_match:
-                        value = token_match.group(1)
-                        return {
-                            "entity_type": entity_type.value,
-                            "value": self._clean_value(value, entity_type),
-                            "original_language": language,
-                            "confidence_score": 0.80,
-                            "extraction_method": "positional"
-                        }
-                    # Else look at the next few lines
-                    for j in range(1, 3):
-                        if i + j < len(lines):
-                            nx = lines[i + j].strip()
-                            token_match2 = re.search(r'([A-Z]{2}[\s\-]?\d{2,4}[\s\-]?\d{4,}[\s\-]?\d*)', nx)
-                            if token_match2:
-                                value = token_match2.group(1)
-                                return {
-                                    "entity_type": entity_type.value,
-                                    "value": self._clean_value(value, entity_type),
-                                    "original_language": language,
-                                    "confidence_score": 0.78,
-                                    "extraction_method": "positional"
-                                }
-            # If still not found, try scanning for a strong DL-like token anywhere
-            any_match = re.search(r'\b([A-Z]{2}\d{2}[\s\-]?\d{4}[\s\-]?\d{5,7})\b', text)
-            if any_match:
-                value = any_match.group(1)
-                return {
-                    "entity_type": entity_type.value,
-                    "value": self._clean_value(value, entity_type),
-                    "original_language": language,
-                    "confidence_score": 0.72,
-                    "extraction_method": "pattern_fallback"
-                }
-            return None
-
         # Use pattern matching for other entities (including EPIC)
-        patterns = self.ENTITY_PATTERNS.get(entity_type, [])
+        return self._extract_regex_entity(text, entity_type, language, line_index.text_lower)
+    
+    def _extract_regex_entity(
+        self, text: str, entity_type: EntityType, language: str, text_lower: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the first hit among the entity's ENTITY_PATTERNS, in priority order"""
+        patterns = self.COMPILED_ENTITY_PATTERNS.get(entity_type, [])
         
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                value = match.group(1).strip()
+            value = self._search_value(pattern, text, text_lower)
+            if value is not None:
+                value = value.strip()
                 confidence = self._calculate_confidence(entity_type, value)
                 
                 return {
@@ -478,77 +885,155 @@ class OCRService:
         
         return None
     
-    def _extract_regional_name(self, text: str, language: str) -> Optional[Dict[str, Any]]:
-        """Extract name in regional language (Tamil, Hindi, etc.) from text"""
-        # Look for Tamil script (Unicode range: 0B80-0BFF)
-        tamil_pattern = r'[\u0B80-\u0BFF]+'
-        # Look for Hindi/Devanagari script (Unicode range: 0900-097F)
-        hindi_pattern = r'[\u0900-\u097F]+'
-        # Look for Telugu script (Unicode range: 0C00-0C7F)
-        telugu_pattern = r'[\u0C00-\u0C7F]+'
-        # Look for Kannada script (Unicode range: 0C80-0CFF)
-        kannada_pattern = r'[\u0C80-\u0CFF]+'
-        # Look for Malayalam script (Unicode range: 0D00-0D7F)
-        malayalam_pattern = r'[\u0D00-\u0D7F]+'
-        
-        regional_patterns = [
-            (tamil_pattern, 'tamil'),
-            (hindi_pattern, 'hindi'),
-            (telugu_pattern, 'telugu'),
-            (kannada_pattern, 'kannada'),
-            (malayalam_pattern, 'malayalam'),
-        ]
+    def _extract_driving_license_number(
+        self, text: str, language: str, line_index: Optional[LineIndex] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Extract DL number: regex patterns first, then positional heuristics near DL labels"""
+        entity_type = EntityType.DRIVING_LICENSE_NUMBER
+        text_lower = line_index.text_lower if line_index is not None else text.lower()
         
-        for pattern, script_lang in regional_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # Find the longest match that looks like a name (not common words)
-                # Skip common Hindi words like भारत (India), सरकार (Government), etc.
-                skip_words = ['भारत', 'सरकार', 'आधार', 'पुरुष', 'महिला', 'पता', 'जन्म', 'तिथि', 
-                             'विशिष्ट', 'पहचान', 'प्राधिकरण', 'मेरा', 'मेरी', 'आयकर', 'विभाग']
-                
-                for match in matches:
-                    # Skip if it's a common word
-                    if match in skip_words:
-                        continue
-                    # Name should be reasonably long (at least 3 characters in regional script)
-                    if len(match) >= 3:
-                        logger.info(f"Found regional name ({script_lang}): {match}")
+        extracted = self._extract_regex_entity(text, entity_type, language, text_lower)
+        if extracted:
+            return extracted
+        
+        # Positional/keyword-based heuristic: search near DL labels
+        # One pass finds every label; each hit is mapped to its line
+        lines = text.split('\n')
+        i, scanned_to, last_line = 0, 0, -1
+        for label in self.DL_LABEL_PATTERN.finditer(text):
+            i += text.count('\n', scanned_to, label.start())
+            scanned_to = label.start()
+            if i == last_line:
+                continue
+            last_line = i
+            
+            # Check same line for a token that resembles DL number
+            token_match = self.DL_TOKEN_PATTERN.search(lines[i].strip())
+            if token_match:
+                value = token_match.group(1)
+                return {
+                    "entity_type": entity_type.value,
+                    "value": self._clean_value(value, entity_type),
+                    "original_language": language,
+                    "confidence_score": 0.80,
+                    "extraction_method": "positional"
+                }
+            # Else look at the next few lines
+            for j in range(1, 3):
+                if i + j < len(lines):
+                    nx = lines[i + j].strip()
+                    token_match2 = self.DL_TOKEN_PATTERN.search(nx)
+                    if token_match2:
+                        value = token_match2.group(1)
                         return {
-                            "entity_type": EntityType.FULL_NAME_REGIONAL.value,
-                            "value": match,
-                            "original_language": script_lang,
-                            "confidence_score": 0.80,
-                            "extraction_method": "unicode_pattern"
+                            "entity_type": entity_type.value,
+                            "value": self._clean_value(value, entity_type),
+                            "original_language": language,
+                            "confidence_score": 0.78,
+                            "extraction_method": "positional"
                         }
+        # If still not found, try scanning for a strong DL-like token anywhere
+        any_match = self.DL_FALLBACK_PATTERN.search(text)
+        if any_match:
+            value = any_match.group(1)
+            return {
+                "entity_type": entity_type.value,
+                "value": self._clean_value(value, entity_type),
+                "original_language": language,
+                "confidence_score": 0.72,
+                "extraction_method": "pattern_fallback"
+            }
+        return None
+    
+    def _extract_regional_name(
+        self, text: str, language: str, line_index: Optional[LineIndex] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Extract name in regional language (Tamil, Hindi, etc.) from text"""
+        # Pure ASCII text has no regional script to find
+        if text.isascii():
+            return None
+        
+        # Collect candidate runs per script in one scan
+        candidates = {lang: [] for lang in self.REGIONAL_SCRIPTS}
+        for match in self.REGIONAL_SCRIPT_PATTERN.finditer(text):
+            candidates[match.lastgroup].append(match.group())
+        
+        # Scripts keep their priority order; first run that looks like a name wins
+        for script_lang, matches in candidates.items():
+            for match in matches:
+                # Skip if it's a common word
+                if match in self.REGIONAL_SKIP_WORDS:
+                    continue
+                # Name should be reasonably long (at least 3 characters in regional script)
+                if len(match) >= 3:
+                    logger.debug("Found regional name ({}): {}", script_lang, match)
+                    return {
+                        "entity_type": EntityType.FULL_NAME_REGIONAL.value,
+                        "value": match,
+                        "original_language": script_lang,
+                        "confidence_score": 0.80,
+                        "extraction_method": "unicode_pattern"
+                    }
         
         return None
     
-    def _extract_father_name(self, text: str, language: str) -> Optional[Dict[str, Any]]:
-        """Extract father's name from text (for PAN cards and Voter ID)"""
-        patterns = [
-            # Voter ID specific patterns
-            r"(?:Father(?:'s)?[\s/|]*Name|Fatver(?:'s)?[\s/|]*Name)[:\s|]*\n?([A-Z][A-Za-z\s\.]+?)(?:\n|$)",
-            r"(?:Husband(?:'s)?[\s/|]*Name)[:\s|]*\n?([A-Z][A-Za-z\s\.]+?)(?:\n|$)",
-            # PAN Card patterns
-            r"(?:Father's Name|FATHER'S NAME|Father Name)[:\s]*\n?([A-Z][A-Z\s]+?)(?:\n|Date|DOB|$)",
-            r"(?:S/O|D/O|Son of|Daughter of|W/O|Wife of)[:\s]*([A-Za-z\s\.]+?)(?:\n|$)",
-            # Hindi patterns
-            r"(?:पिता का नाम|पिता)[:\s]*(.+?)(?:\n|$)",
-        ]
+    def _search_value(self, pattern: re.Pattern, text: str, text_lower: str) -> Optional[str]:
+        """
+        Run a lowercased pattern over the lowercased text and return group 1
+        cut from the original text, so extracted values keep their case
+        """
+        if len(text_lower) == len(text):
+            match = pattern.search(text_lower)
+            return text[match.start(1):match.end(1)] if match else None
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                name = match.group(1).strip()
-                name = re.sub(r'\s+', ' ', name)
+        # Lowercasing changed the length (rare non-ASCII input), so offsets don't line up
+        match = re.compile(pattern.pattern, re.IGNORECASE | re.MULTILINE).search(text)
+        return match.group(1) if match else None
+    
+    def _scan_lines(self, text: str) -> LineIndex:
+        """Split OCR text into lines and record the anchors the name extractors use"""
+        lines = []
+        dob_idx = pan_idx = to_idx = -1
+        name_idxs = []
+        
+        for i, line in enumerate(text.split('\n')):
+            clean_line = line.strip()
+            lower_line = clean_line.lower()
+            lines.append(clean_line)
+            
+            if 'dob:' in lower_line or 'date of birth' in lower_line or 'year of birth' in lower_line:
+                dob_idx = i
+            # Very specific PAN Check
+            if 'permanent account number' in lower_line or 'income tax department' in lower_line or 'pan' in lower_line.split(' '):
+                pan_idx = i
+            if to_idx == -1 and lower_line == 'to':
+                to_idx = i
+            
+            if clean_line and self.NAME_LINE_PATTERN.match(clean_line):
+                if not self._has_skip_word(lower_line):
+                    name_idxs.append(i)
+        
+        return LineIndex(text.lower(), lines, dob_idx, pan_idx, to_idx, name_idxs)
+    
+    def _extract_father_name(
+        self, text: str, language: str, line_index: Optional[LineIndex] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Extract father's name from text (for PAN cards and Voter ID)"""
+        if line_index is None:
+            line_index = self._scan_lines(text)
+        
+        for pattern in self.FATHER_NAME_PATTERNS:
+            name = self._search_value(pattern, text, line_index.text_lower)
+            if name is not None:
+                name = name.strip()
+                name = self.WHITESPACE_RUN_PATTERN.sub(' ', name)
                 
                 # Skip if contains government keywords
-                if any(word.lower() in name.lower() for word in self.SKIP_NAME_WORDS):
+                if self._has_skip_word(name.lower()):
                     continue
                 
                 # Skip single words that are common OCR errors
-                if name.lower() in ['name', 'male', 'female', 'date']:
+                if name.lower() in self.FATHER_MATCH_SKIP_WORDS:
                     continue
                     
                 if 3 <= len(name) <= 50:
@@ -562,25 +1047,24 @@ class OCRService:
         
         # For PAN cards - the second name line is typically the father's name
         # Pattern: After holder name, look for another name line before DOB
-        lines = text.split('\n')
-        name_lines = []
-        for line in lines:
-            clean_line = line.strip()
-            # Check if line contains only letters and spaces (name pattern)
-            if clean_line and re.match(r'^[A-Za-z\s\.]+$', clean_line):
-                # Skip government keywords
-                if any(word.lower() in clean_line.lower() for word in self.SKIP_NAME_WORDS):
-                    continue
-                # Skip single common words
-                if clean_line.lower() in ['name', 'male', 'female', 'date', 'are']:
-                    continue
-                if 3 <= len(clean_line) <= 50 and self._is_valid_english_name(clean_line):
-                    name_lines.append(clean_line)
+        # Only the first two name lines matter: stop as soon as the second is found
+        first = second = None
+        for i in line_index.name_idxs:
+            clean_line = line_index.lines[i]
+            # Skip single common words
+            if clean_line.lower() in self.FATHER_LINE_SKIP_WORDS:
+                continue
+            if 3 <= len(clean_line) <= 50 and self._is_valid_english_name(clean_line):
+                if first is None:
+                    first = clean_line
+                else:
+                    second = clean_line
+                    break
         
         # If we found at least 2 name lines, second one is likely father's name
-        if len(name_lines) >= 2:
-            father_name = re.sub(r'\s+', ' ', name_lines[1]).title()
-            logger.info(f"Found father name from line scan: {father_name}")
+        if second is not None:
+            father_name = self.WHITESPACE_RUN_PATTERN.sub(' ', second).title()
+            logger.debug("Found father name from line scan: {}", father_name)
             return {
                 "entity_type": EntityType.FATHER_NAME.value,
                 "value": father_name,
@@ -591,19 +1075,23 @@ class OCRService:
         
         return None
     
-    def _extract_name(self, text: str, language: str) -> Optional[Dict[str, Any]]:
+    def _extract_name(
+        self, text: str, language: str, line_index: Optional[LineIndex] = None
+    ) -> Optional[Dict[str, Any]]:
         """Extract name from text"""
-        patterns = self.NAME_PATTERNS.get(language, self.NAME_PATTERNS["en"])
+        if line_index is None:
+            line_index = self._scan_lines(text)
+        patterns = self.COMPILED_NAME_PATTERNS.get(language, self.COMPILED_NAME_PATTERNS["en"])
         
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                name = match.group(1).strip()
+            name = self._search_value(pattern, text, line_index.text_lower)
+            if name is not None:
+                name = name.strip()
                 # Clean up name
-                name = re.sub(r'\s+', ' ', name)
+                name = self.WHITESPACE_RUN_PATTERN.sub(' ', name)
                 
                 # Skip if name contains government/official keywords
-                if any(word.lower() in name.lower() for word in self.SKIP_NAME_WORDS):
+                if self._has_skip_word(name.lower()):
                     continue
                     
                 # Skip if name is too short or looks like a header
@@ -621,31 +1109,24 @@ class OCRService:
                 }
 
         # --- Enhanced Positional Extraction ---
-        lines = text.split('\n')
-        
         # 1. Look relative to specific anchors (DOB, Gender, PAN, Govt Header)
-        dob_line_idx = -1
-        pan_line_idx = -1
-        
-        for i, line in enumerate(lines):
-            clean_line = line.strip().lower()
-            if 'dob:' in clean_line or 'date of birth' in clean_line or 'year of birth' in clean_line:
-                dob_line_idx = i
-            # Very specific PAN Check
-            if 'permanent account number' in clean_line or 'income tax department' in clean_line or 'pan' in clean_line.split(' '):
-                pan_line_idx = i
+        lines = line_index.lines
+        dob_line_idx = line_index.dob_idx
+        pan_line_idx = line_index.pan_idx
+        # Lines outside the letters-only candidates can never be names, so only those are validated
+        candidate_idxs = set(line_index.name_idxs)
 
         # Strategy A: Above DOB (Common in Aadhaar)
         if dob_line_idx != -1:
             # Look up to 3 lines above DOB
             for i in range(1, 4):
-                if dob_line_idx - i >= 0:
-                    candidate = lines[dob_line_idx - i].strip()
-                    if self._is_potential_name(candidate):
+                if dob_line_idx - i in candidate_idxs:
+                    candidate = lines[dob_line_idx - i]
+                    if self._is_name_candidate(candidate):
                         # Skip if it is the Aadhaar number (mostly digits)
-                        if re.search(r'\d{4}', candidate):
+                        if self.FOUR_DIGITS_PATTERN.search(candidate):
                             continue
-                        logger.info(f"Found name relative to DOB: {candidate}")
+                        logger.debug("Found name relative to DOB: {}", candidate)
                         return {
                             "entity_type": EntityType.FULL_NAME.value,
                             "value": candidate.title(),
@@ -658,16 +1139,16 @@ class OCRService:
         if pan_line_idx != -1:
              # Look up to 4 lines below PAN header
             for i in range(1, 5):
-                if pan_line_idx + i < len(lines):
-                    candidate = lines[pan_line_idx + i].strip()
-                    if self._is_potential_name(candidate):
+                if pan_line_idx + i in candidate_idxs:
+                    candidate = lines[pan_line_idx + i]
+                    if self._is_name_candidate(candidate):
                         # Don't pick the PAN number itself
-                        if re.search(r'[A-Z]{5}[0-9O]{4}[A-Z]', candidate):
+                        if self.PAN_LIKE_PATTERN.search(candidate):
                             continue
                          # Don't pick Signature label
                         if 'sign' in candidate.lower():
                             continue
-                        logger.info(f"Found name relative to PAN Header: {candidate}")
+                        logger.debug("Found name relative to PAN Header: {}", candidate)
                         return {
                             "entity_type": EntityType.FULL_NAME.value,
                             "value": candidate.title(),
@@ -676,19 +1157,13 @@ class OCRService:
                             "extraction_method": "relative_pan"
                         }
 
-        # Fallback: General Line Scan
-        found_to_label = False
-        for i, line in enumerate(lines):
-            clean_line = line.strip()
-            
-            # Track "To" label for Aadhaar cards
-            if clean_line.lower() == 'to':
-                found_to_label = True
-                continue
+        # Fallback: General Line Scan over the letters-only candidates
+        for i in line_index.name_idxs:
+            clean_line = lines[i]
             
-            if self._is_potential_name(clean_line):
-                # If we found "To" label, this is likely the name (Aadhaar format)
-                confidence = 0.85 if found_to_label else 0.70
+            if self._is_name_candidate(clean_line):
+                # If a "To" label came first, this is likely the name (Aadhaar format)
+                confidence = 0.85 if -1 < line_index.to_idx < i else 0.70
                 
                 return {
                     "entity_type": EntityType.FULL_NAME.value,
@@ -705,30 +1180,40 @@ class OCRService:
         clean_line = text.strip()
         
         # Check if line contains only letters and spaces (and is uppercase - common in ID cards)
-        if not clean_line or not re.match(r'^[A-Za-z\s\.]+$', clean_line):
+        if not clean_line or not self.NAME_LINE_PATTERN.match(clean_line):
             return False
             
         # Skip lines containing government/official keywords
-        if any(word.lower() in clean_line.lower() for word in self.SKIP_NAME_WORDS):
+        if self._has_skip_word(clean_line.lower()):
             return False
         
-        # Skip single common words/labels
-        if clean_line.lower() in ['name', 'to', 'from', 'signature', 'sign']:
+        return self._is_name_candidate(clean_line)
+    
+    def _has_skip_word(self, text_lower: str) -> bool:
+        """Check lowercased text for any government/official keyword"""
+        if self.SKIP_NAME_AUTOMATON is not None:
+            return next(self.SKIP_NAME_AUTOMATON.iter(text_lower), None) is not None
+        return self.SKIP_NAME_PATTERN.search(text_lower) is not None
+    
+    def _is_name_candidate(self, clean_line: str) -> bool:
+        """
+        Remaining name checks for a line from LineIndex.name_idxs
+        (already stripped, letters-only and free of government keywords)
+        """
+        # Check length constraints
+        if not (3 <= len(clean_line) <= 50):
             return False
-
-        # Skip if the name looks like OCR garbage (random characters)
-        if not self._is_valid_english_name(clean_line):
+        
+        # Skip single common words/labels
+        if clean_line.lower() in self.NAME_LINE_SKIP_WORDS:
             return False
         
         # Skip S/O, D/O, W/O lines
-        if re.match(r'^[SDWC]/O\s', clean_line, re.IGNORECASE):
-            return False
-            
-        # Check length constraints
-        if not (3 <= len(clean_line) <= 50):
+        if self.RELATION_PREFIX_PATTERN.match(clean_line):
             return False
-            
-        return True
+        
+        # Skip if the name looks like OCR garbage (random characters)
+        return self._is_valid_english_name(clean_line)
     
     def _is_valid_english_name(self, name: str) -> bool:
         """
@@ -741,12 +1226,11 @@ class OCRService:
         if len(clean) < 2:
             return False
         
-        # Count vowels and consonants
-        vowels = set('aeiou')
-        consonants = set('bcdfghjklmnpqrstvwxyz')
-        
-        vowel_count = sum(1 for c in clean if c in vowels)
-        consonant_count = sum(1 for c in clean if c in consonants)
+        # Count vowels and consonants: map each letter to V/C once, then count in C.
+        # Spaces are kept so consonant runs don't join across words ("Ann McDonald")
+        letter_classes = name.replace('.', '').lower().translate(self.LETTER_CLASS_TABLE)
+        vowel_count = letter_classes.count('V')
+        consonant_count = letter_classes.count('C')
         
         total_letters = vowel_count + consonant_count
         if total_letters == 0:
@@ -759,39 +1243,93 @@ class OCRService:
         if vowel_ratio < 0.15 or vowel_ratio > 0.6:
             return False
         
-        # Check for unusual consonant clusters (more than 3 consonants in a row)
+        # Check for unusual consonant clusters within a word (more than 4 consonants in a row)
         # This catches OCR garbage like "Gufweniseny" (which has unusual patterns)
-        consonant_streak = 0
-        max_consonant_streak = 0
-        for c in clean:
-            if c in consonants:
-                consonant_streak += 1
-                max_consonant_streak = max(max_consonant_streak, consonant_streak)
-            else:
-                consonant_streak = 0
-        
         # Most English names don't have more than 3 consonants in a row
-        if max_consonant_streak > 4:
+        if self.CONSONANT_RUN in letter_classes:
             return False
         
         # Check for repeated unusual patterns (OCR often produces these)
         # E.g., "weni" in "Gufweniseny" is unusual
-        unusual_patterns = ['fw', 'wf', 'guf', 'ufwe', 'weni', 'nise']
-        for pattern in unusual_patterns:
-            if pattern in clean:
-                return False
+        if self.UNUSUAL_LETTERS_PATTERN.search(clean):
+            return False
+        
+        # Word-level garbage rules catch mixed-case and repeated-character noise
+        if any(self._is_garbage_token(token) for token in name.split()):
+            return False
         
         return True
     
-    def _extract_address(self, text: str, language: str) -> Optional[Dict[str, Any]]:
+    def _is_garbage_token(self, token: str) -> bool:
+        """
+        Garbage-string rules from Taghva et al. applied to one OCR token.
+        Consonant clusters are already limited by _is_valid_english_name.
+        """
+        # Implausibly long, a character three times in a row, or four vowels in a row
+        if len(token) >= 21 or (
+            self.GARBAGE_RUN_PATTERN.search(token) and not self.ROMAN_NUMERAL_PATTERN.fullmatch(token)
+        ):
+            return True
+        
+        # The case rules only look past a Mc/Mac/O' prefix (McDONALD, MacDonald)
+        prefix = self.SURNAME_PREFIX_PATTERN.match(token)
+        case_start = prefix.end() if prefix else 0
+        
+        # Count character classes: one translate plus str.count for ASCII, per-character otherwise
+        if token.isascii():
+            classes = token.translate(self.TOKEN_CLASS_TABLE)
+            upper_vowels, upper_consonants = classes.count('A'), classes.count('B')
+            lower_vowels, lower_consonants = classes.count('v'), classes.count('c')
+            vowels, consonants = upper_vowels + lower_vowels, upper_consonants + lower_consonants
+            upper_count, lower_count = upper_vowels + upper_consonants, lower_vowels + lower_consonants
+            if case_start:
+                cased = classes[case_start:]
+                upper_count = cased.count('A') + cased.count('B')
+                lower_count = cased.count('v') + cased.count('c')
+            alnum_count = len(token) - classes.count('P')
+        else:
+            letter_classes = token.lower().translate(self.LETTER_CLASS_TABLE)
+            vowels, consonants = letter_classes.count('V'), letter_classes.count('C')
+            cased = token[case_start:]
+            upper_count = sum(1 for c in cased if c.isupper())
+            lower_count = sum(1 for c in cased if c.islower())
+            alnum_count = sum(1 for c in token if c.isalnum())
+        
+        # Vowels and consonants both present but one outnumbers the other 8 to 1
+        if vowels and consonants and (vowels > 8 * consonants or consonants > 8 * vowels):
+            return True
+        
+        # Mostly uppercase with some lowercase, or an uppercase letter inside a lowercase word
+        if lower_count and upper_count > lower_count:
+            return True
+        if upper_count and token[case_start].islower() and token[-1].islower():
+            return True
+        
+        # More punctuation than letters/digits, or two different punctuation marks inside
+        if alnum_count < len(token) - alnum_count:
+            return True
+        if len(token) - alnum_count >= 2 and len({c for c in token[1:-1] if not c.isalnum()}) >= 2:
+            return True
+        
+        return False
+    
+    def _extract_address(
+        self, text: str, language: str, line_index: Optional[LineIndex] = None
+    ) -> Optional[Dict[str, Any]]:
         """Extract address from text - stops at pincode"""
-        # Look for address section
-        text_lower = text.lower()
+        # Look for address section: plain find on the shared lowercased text when its
+        # offsets match the original, otherwise case-insensitive search on the original
+        if line_index is not None and len(line_index.text_lower) == len(text):
+            positions = (line_index.text_lower.find(keyword) for keyword in self.ADDRESS_KEYWORDS)
+        else:
+            positions = (
+                match.start() if (match := pattern.search(text)) else -1
+                for pattern in self.ADDRESS_KEYWORD_PATTERNS
+            )
         
-        for keyword in self.ADDRESS_KEYWORDS:
-            if keyword.lower() in text_lower:
-                # Find position and extract following text
-                idx = text_lower.find(keyword.lower())
+        for idx in positions:
+            # Extract following text
+            if idx != -1:
                 address_text = text[idx:idx + 400]
                 
                 # Extract until pincode or end
@@ -805,7 +1343,7 @@ class OCRService:
                         continue
                     
                     # Check if line contains pincode (6-digit number)
-                    pincode_match = re.search(r'\b(\d{6})\b', cleaned)
+                    pincode_match = self.PINCODE_PATTERN.search(cleaned)
                     if pincode_match:
                         # Include the line with pincode but stop there
                         # Extract only up to and including the pincode
@@ -815,7 +1353,7 @@ class OCRService:
                         break
                     
                     # Skip lines that look like document identifiers (Aadhaar, etc.)
-                    if re.match(r'^\d{4}\s?\d{4}\s?\d{4}$', cleaned):
+                    if cleaned[0].isdigit() and self.AADHAAR_LINE_PATTERN.match(cleaned):
                         continue
                     
                     address_lines.append(cleaned)
@@ -823,9 +1361,8 @@ class OCRService:
                 if address_lines:
                     address = ', '.join(address_lines)
                     # Clean up address - remove trailing commas, extra spaces
-                    address = re.sub(r',\s*$', '', address)
-                    address = re.sub(r'\s+', ' ', address)
-                    logger.info(f"Extracted address (pincode_found={pincode_found}): {address}")
+                    address = self._tidy_address(address)
+                    logger.debug("Extracted address (pincode_found={}): {}", pincode_found, address)
                     return {
                         "entity_type": EntityType.ADDRESS.value,
                         "value": address,
@@ -835,7 +1372,7 @@ class OCRService:
                     }
         
         # Fallback: Look for PIN code pattern and extract surrounding text as address
-        pin_match = re.search(r'\b(\d{6})\b', text)
+        pin_match = self.PINCODE_PATTERN.search(text)
         if pin_match:
             # Find text before PIN code - likely address
             pin_pos = pin_match.start()
@@ -851,9 +1388,9 @@ class OCRService:
                 # Skip lines that are just numbers or very short
                 if cleaned and len(cleaned) > 3:
                     # Skip lines that look like Aadhaar numbers
-                    if not re.match(r'^\d{4}\s?\d{4}\s?\d{4}$', cleaned):
+                    if not (cleaned[0].isdigit() and self.AADHAAR_LINE_PATTERN.match(cleaned)):
                         # If this line contains the pincode, extract only up to pincode
-                        pincode_in_line = re.search(r'\b(\d{6})\b', cleaned)
+                        pincode_in_line = self.PINCODE_PATTERN.search(cleaned)
                         if pincode_in_line:
                             address_lines.append(cleaned[:pincode_in_line.end()].strip())
                         else:
@@ -862,9 +1399,8 @@ class OCRService:
             if address_lines:
                 address = ', '.join(address_lines)
                 # Clean up - remove trailing commas and extra spaces
-                address = re.sub(r',\s*$', '', address)
-                address = re.sub(r'\s+', ' ', address)
-                logger.info(f"Extracted address from PIN code fallback: {address}")
+                address = self._tidy_address(address)
+                logger.debug("Extracted address from PIN code fallback: {}", address)
                 return {
                     "entity_type": EntityType.ADDRESS.value,
                     "value": address,
@@ -875,31 +1411,39 @@ class OCRService:
         
         return None
     
+    def _tidy_address(self, address: str) -> str:
+        """Remove a trailing comma and collapse whitespace runs"""
+        return self.ADDRESS_CLEANUP_PATTERN.sub(
+            lambda m: '' if m.group()[0] == ',' else ' ', address
+        )
+    
     def _calculate_confidence(self, entity_type: EntityType, value: str) -> float:
         """Calculate confidence score for extracted value"""
         base_confidence = 0.80
         
         # Validate specific formats
         if entity_type == EntityType.AADHAAR_NUMBER:
-            clean = re.sub(r'\s', '', value)
+            clean = self.WHITESPACE_PATTERN.sub('', value)
             if len(clean) == 12 and clean.isdigit():
                 return 0.95
         
         if entity_type == EntityType.PAN_NUMBER:
-            if re.match(r'^[A-Z]{5}[0-9]{4}[A-Z]$', value.upper()):
+            if self.PAN_FORMAT_PATTERN.match(value.upper()):
                 return 0.95
         
         if entity_type == EntityType.DATE_OF_BIRTH:
-            try:
-                # Try to parse date
-                for fmt in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d.%m.%Y']:
-                    try:
-                        datetime.strptime(value, fmt)
-                        return 0.90
-                    except:
-                        continue
-            except:
-                pass
+            # One match picks the format; datetime then rejects impossible dates
+            match = self.DOB_FORMAT_PATTERN.fullmatch(value)
+            if match:
+                try:
+                    datetime(
+                        int(match['y1'] or match['y2']),
+                        int(match['m1'] or match['m2']),
+                        int(match['d1'] or match['d2'])
+                    )
+                    return 0.90
+                except ValueError:
+                    pass
         
         return base_confidence
     
@@ -915,49 +1459,17 @@ class OCRService:
             return value
         
         value = value.upper()
-        result = list(value)
-        
-        # First 5 characters should be letters
-        # Fix digits that were misread as letters (rarely needed but can happen)
-        ocr_digit_to_letter = {
-            '0': 'O',
-            '1': 'I',
-            '8': 'B',
-        }
-        
-        for i in range(0, 5):  # Positions 0-4 should be letters
-            if result[i].isdigit() and result[i] in ocr_digit_to_letter:
-                result[i] = ocr_digit_to_letter[result[i]]
-        
-        # Characters 5-8 should be digits - fix common OCR errors
-        ocr_letter_to_digit = {
-            'S': '8', 'B': '8',
-            'O': '0', 'Q': '0', 'D': '0',
-            'I': '1', 'L': '1', 'J': '1',
-            'Z': '2',
-            'E': '3',
-            'A': '4', 'H': '4',
-            'G': '6',
-            'T': '7',
-            'P': '9',  # P can look like 9
-            'R': '2',  # R can look like 2
-        }
-        
-        for i in range(5, 9):  # Positions 5-8 should be digits
-            if result[i] in ocr_letter_to_digit:
-                result[i] = ocr_letter_to_digit[result[i]]
         
-        # Character 9 should be a letter
-        if result[9].isdigit() and result[9] in ocr_digit_to_letter:
-            result[9] = ocr_digit_to_letter[result[9]]
-        
-        # Verify result looks like a valid PAN
-        fixed = ''.join(result)
-        logger.info(f"PAN OCR fix: {value} -> {fixed}")
+        # Positions 0-4 and 9 should be letters, positions 5-8 digits
+        fixed = (
+            value[:5].translate(self.PAN_DIGIT_TO_LETTER)
+            + value[5:9].translate(self.PAN_LETTER_TO_DIGIT)
+            + value[9:10].translate(self.PAN_DIGIT_TO_LETTER)
+            + value[10:]
+        )
+        logger.debug("PAN OCR fix: {} -> {}", value, fixed)
         
         return fixed
-        
-        return ''.join(result)
     
     def _clean_value(self, value: str, entity_type: EntityType) -> str:
         """Clean extracted value"""
@@ -965,7 +1477,7 @@ class OCRService:
         
         if entity_type == EntityType.AADHAAR_NUMBER:
             # Format as XXXX XXXX XXXX
-            clean = re.sub(r'\s', '', value)
+            clean = self.WHITESPACE_PATTERN.sub('', value)
             if len(clean) == 12:
                 return f"{clean[:4]} {clean[4:8]} {clean[8:]}"
         
@@ -977,7 +1489,7 @@ class OCRService:
         
         if entity_type == EntityType.ANNUAL_INCOME:
             # Remove currency symbols and format
-            clean = re.sub(r'[₹Rs\.\s,]', '', value)
+            clean = self.INCOME_STRIP_PATTERN.sub('', value)
             if clean.isdigit():
                 return f"₹{int(clean):,}"
         
@@ -1000,56 +1512,33 @@ class OCRService:
         # Clean driving license number
         if entity_type == EntityType.DRIVING_LICENSE_NUMBER:
             # Remove spaces and hyphens, return uppercase
-            clean = re.sub(r'[\s\-/]', '', value.upper())
+            clean = self.DL_SEPARATOR_PATTERN.sub('', value.upper())
             return clean
         
         return value
     
     def _format_date_with_month_name(self, date_str: str) -> str:
         """Convert date to 'DD Mon YYYY' format (e.g., 15 Jan 1990)"""
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        
-        # Try different date formats
-        # DD/MM/YYYY, DD-MM-YYYY, DD.MM.YYYY
-        date_patterns = [
-            (r'(\d{2})[/\-\.](\d{2})[/\-\.](\d{4})', 'day_first'),  # DD/MM/YYYY
-            (r'(\d{4})[/\-\.](\d{2})[/\-\.](\d{2})', 'year_first'),  # YYYY/MM/DD
-        ]
-        
-        for pattern, format_type in date_patterns:
-            match = re.match(pattern, date_str.strip())
-            if match:
-                if format_type == 'day_first':
-                    day, month, year = match.groups()
-                else:  # year_first
-                    year, month, day = match.groups()
-                
-                try:
-                    month_idx = int(month) - 1
-                    if 0 <= month_idx < 12:
-                        month_name = month_names[month_idx]
-                        return f"{int(day)} {month_name} {year}"
-                except (ValueError, IndexError):
-                    pass
+        match = self.DATE_PATTERN.match(date_str.strip())
+        if match:
+            day = match['d1'] or match['d2']
+            month_idx = int(match['m1'] or match['m2']) - 1
+            year = match['y1'] or match['y2']
+            if 0 <= month_idx < 12:
+                return f"{int(day)} {self.MONTH_NAMES[month_idx]} {year}"
         
         # If no pattern matched, return original
         return date_str
     
     def _normalize_blood_group(self, value: str) -> str:
         """Normalize blood group to standard format (e.g., A+, B-, AB+, O-)"""
-        value_upper = value.upper().strip()
-        
-        # Handle written forms
-        value_upper = value_upper.replace('POSITIVE', '+').replace('POS', '+')
-        value_upper = value_upper.replace('NEGATIVE', '-').replace('NEG', '-')
-        
-        # Remove spaces
-        value_upper = re.sub(r'\s+', '', value_upper)
+        # Handle written forms and remove spaces
+        value_upper = self.BLOOD_GROUP_SUB_PATTERN.sub(
+            lambda m: self.BLOOD_GROUP_SIGNS.get(m.group(), ''), value.upper().strip()
+        )
         
         # Validate and return
-        valid_groups = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
-        if value_upper in valid_groups:
+        if value_upper in self.VALID_BLOOD_GROUPS:
             return value_upper
         
         return value
@@ -2,9 +2,9 @@
 Voice Input Service
 Speech-to-text processing with user approval workflow
 """
+import asyncio
 import base64
 import io
-import tempfile
 from typing import Dict, Optional, List
 import speech_recognition as sr
 from loguru import logger
@@ -42,31 +42,13 @@ class VoiceInputService:
         Audio must be base64 encoded
         """
         try:
-            # Decode base64 audio
-            audio_bytes = base64.b64decode(audio_data)
-            
-            # Save to temporary file for processing
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
-            
-            # Load audio file
-            with sr.AudioFile(temp_path) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.record(source)
-            
             # Get language code
             lang_code = self.LANGUAGE_CODES.get(language, "en-IN")
             
-            # Recognize speech using Google Speech Recognition
+            # Decoding, WAV parsing and the recognition call all block, so run them off the event loop
             try:
                 # Get main result
-                result = self.recognizer.recognize_google(
-                    audio,
-                    language=lang_code,
-                    show_all=True
-                )
+                result = await asyncio.to_thread(self._recognize_sync, audio_data, lang_code)
                 
                 if not result:
                     return VoiceInputResponse(
@@ -98,7 +80,7 @@ class VoiceInputService:
                     confidence = 0.8
                     alt_texts = []
                 
-                logger.info(f"Voice input recognized: '{recognized_text}' (confidence: {confidence})")
+                logger.debug("Voice input recognized: '{}' (confidence: {})", recognized_text, confidence)
                 
                 return VoiceInputResponse(
                     success=True,
@@ -127,15 +109,23 @@ class VoiceInputService:
         except Exception as e:
             logger.error(f"Voice input processing error: {e}", exc_info=True)
             raise ValueError(f"Failed to process voice input: {str(e)}")
+    
+    def _recognize_sync(self, audio_data: str, lang_code: str):
+        """Decode base64 WAV audio and run Google Speech Recognition (blocking)"""
+        audio_bytes = base64.b64decode(audio_data)
+        
+        # AudioFile reads file-like objects directly, so no temp file is needed
+        # No per-request ambient-noise calibration: record() ignores energy_threshold,
+        # and the calibration consumed the first 0.5s of the clip
+        with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
+            audio = self.recognizer.record(source)
         
-        finally:
-            # Clean up temp file
-            import os
-            if 'temp_path' in locals():
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
+        # Recognize speech using Google Speech Recognition
+        return self.recognizer.recognize_google(
+            audio,
+            language=lang_code,
+            show_all=True
+        )
     
     def validate_audio_format(self, audio_data: str) -> bool:
         """Validate audio data format"""
@@ -3,6 +3,7 @@ File Utilities
 File handling, validation, and processing helpers
 """
 import os
+import asyncio
 import hashlib
 import aiofiles
 import uuid
@@ -22,24 +23,26 @@ ALLOWED_MIME_TYPES = {
     'application/pdf': ['.pdf']
 }
 
+# Leading bytes expected for each extension (tuples so bytes.startswith checks them in one call)
+MAGIC_NUMBERS = {
+    '.jpg': (b'\xff\xd8\xff',),
+    '.jpeg': (b'\xff\xd8\xff',),
+    '.png': (b'\x89PNG',),
+    '.tiff': (b'II*\x00', b'MM\x00*'),
+    '.tif': (b'II*\x00', b'MM\x00*'),
+    '.pdf': (b'%PDF',)
+}
+
+# Uploads are hashed and written in blocks of this size instead of being read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
 
 async def validate_file(file: UploadFile) -> Tuple[bool, str]:
     """
-    Validate uploaded file
+    Validate uploaded file name and content type
     Returns (is_valid, error_message)
+    Size and magic bytes are checked by save_temp_file while it streams the content
     """
-    # Check file size
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
-    
-    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
-    if file_size > max_size:
-        return False, f"File size exceeds maximum allowed ({settings.MAX_FILE_SIZE_MB}MB)"
-    
-    if file_size == 0:
-        return False, "Empty file uploaded"
-    
     # Check file extension
     ext = Path(file.filename).suffix.lower()
     if ext not in ALLOWED_EXTENSIONS:
@@ -54,40 +57,20 @@ async def validate_file(file: UploadFile) -> Tuple[bool, str]:
     if ext not in ALLOWED_MIME_TYPES.get(content_type, []):
         return False, "File extension does not match content type"
     
-    # Read magic bytes to verify file type
-    magic_bytes = await read_magic_bytes(file)
-    if not verify_magic_bytes(magic_bytes, ext):
-        return False, "File content does not match declared type"
-    
     return True, ""
 
 
-async def read_magic_bytes(file: UploadFile, num_bytes: int = 8) -> bytes:
-    """Read magic bytes from file"""
-    content = await file.read(num_bytes)
-    await file.seek(0)  # Reset file position
-    return content
-
-
 def verify_magic_bytes(magic: bytes, extension: str) -> bool:
     """Verify file magic bytes match extension"""
-    magic_numbers = {
-        '.jpg': [b'\xff\xd8\xff'],
-        '.jpeg': [b'\xff\xd8\xff'],
-        '.png': [b'\x89PNG'],
-        '.tiff': [b'II*\x00', b'MM\x00*'],
-        '.tif': [b'II*\x00', b'MM\x00*'],
-        '.pdf': [b'%PDF']
-    }
-    
-    expected = magic_numbers.get(extension, [])
-    return any(magic.startswith(m) for m in expected)
+    expected = MAGIC_NUMBERS.get(extension)
+    return bool(expected) and magic.startswith(expected)
 
 
 async def save_temp_file(file: UploadFile, user_id: str) -> Tuple[str, str, int]:
     """
-    Save uploaded file to temporary storage
+    Save uploaded file to temporary storage, validating it in the same pass
     Returns (file_path, file_hash, file_size)
+    Raises HTTPException (400) for empty, oversized or mismatched content
     """
     # Create user directory
     user_dir = Path(settings.TEMP_UPLOAD_DIR) / user_id
@@ -98,14 +81,35 @@ async def save_temp_file(file: UploadFile, user_id: str) -> Tuple[str, str, int]
     unique_filename = f"{uuid.uuid4()}{ext}"
     file_path = user_dir / unique_filename
     
-    # Read and hash content
-    content = await file.read()
-    file_hash = hashlib.sha256(content).hexdigest()
-    file_size = len(content)
+    # Validate, hash and save in one forward pass; hashing runs in a worker thread
+    # (hashlib releases the GIL) so it overlaps the write and doesn't block the event loop
+    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    hasher = hashlib.sha256()
+    file_size = 0
+    error = None
+    try:
+        async with aiofiles.open(file_path, 'wb') as f:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                error = "Empty file uploaded"
+            elif not verify_magic_bytes(chunk, ext):
+                error = "File content does not match declared type"
+            
+            while chunk and error is None:
+                file_size += len(chunk)
+                if file_size > max_size:
+                    error = f"File size exceeds maximum allowed ({settings.MAX_FILE_SIZE_MB}MB)"
+                    break
+                await asyncio.gather(asyncio.to_thread(hasher.update, chunk), f.write(chunk))
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    except Exception:
+        os.remove(file_path)
+        raise
     
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(content)
+    if error:
+        os.remove(file_path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    file_hash = hasher.hexdigest()
     
     logger.info(f"Saved temp file: {file_path} ({file_size} bytes)")
     return str(file_path), file_hash, file_size
@@ -129,21 +133,28 @@ async def cleanup_user_temp_files(user_id: str) -> int:
     Clean up all temporary files for a user
     Returns number of files deleted
     """
-    user_dir = Path(settings.TEMP_UPLOAD_DIR) / user_id
+    user_dir = os.path.join(settings.TEMP_UPLOAD_DIR, user_id)
     deleted_count = 0
+    failed_count = 0
     
-    if user_dir.exists():
-        for file_path in user_dir.iterdir():
-            try:
-                file_path.unlink()
-                deleted_count += 1
-            except Exception as e:
-                logger.error(f"Error deleting {file_path}: {e}")
+    if os.path.isdir(user_dir):
+        with os.scandir(user_dir) as entries:
+            for entry in entries:
+                try:
+                    os.unlink(entry.path)
+                    deleted_count += 1
+                except OSError as e:
+                    failed_count += 1
+                    if settings.DEBUG:
+                        logger.error(f"Error deleting {entry.path}: {e}")
+        
+        if failed_count:
+            logger.error(f"Could not delete {failed_count} temp files for user {user_id}")
         
         # Remove user directory
         try:
-            user_dir.rmdir()
-        except Exception:
+            os.rmdir(user_dir)
+        except OSError:
             pass
     
     logger.info(f"Cleaned up {deleted_count} temp files for user {user_id}")
@@ -2,71 +2,172 @@
 Security Utilities
 Encryption, hashing, and security helper functions
 """
+import asyncio
 import base64
 import hashlib
+import os
+import re
 import secrets
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF, HKDFExpand
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import bcrypt
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 from loguru import logger
 
 from app.config import settings
 
+# bcrypt releases the GIL while hashing, so a bounded thread pool keeps password
+# checks off the event loop without oversubscribing the CPU
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=settings.BCRYPT_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="bcrypt"
+)
+
+
+# $2a$/$2b$/$2y$, two-digit cost, then 22 salt + 31 hash characters
+_BCRYPT_HASH_PATTERN = re.compile(r'\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}')
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_COST)
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 
+def calibrate_bcrypt_cost(target_ms: int, min_cost: int = 10, max_cost: int = 14) -> int:
+    """
+    Pick the largest bcrypt cost whose hash time on this machine fits within target_ms
+    Never returns less than min_cost
+    """
+    cost = min_cost
+    for rounds in range(min_cost, max_cost + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"x" * 16, bcrypt.gensalt(rounds=rounds))
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        cost = rounds
+    return cost
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
+    # Empty or malformed stored hashes can never match, so skip bcrypt for them
+    if not hashed_password or not _BCRYPT_HASH_PATTERN.fullmatch(hashed_password):
+        return False
     try:
         return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
     except Exception:
         return False
 
 
-def get_encryption_key() -> bytes:
-    """Generate encryption key from settings"""
-    # Use PBKDF2 to derive a key from the encryption key setting
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=settings.SECRET_KEY[:16].encode(),
-        iterations=100000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(settings.ENCRYPTION_KEY.encode()))
-    return key
+async def ahash_password(password: str) -> str:
+    """Hash a password on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, hash_password, password)
+
 
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
 
-# Fernet cipher for symmetric encryption
+
+def _wipe(buffer: bytearray) -> None:
+    """Overwrite key material held in a mutable buffer"""
+    buffer[:] = bytes(len(buffer))
+
+
+def _derive_raw_key() -> bytearray:
+    """
+    Derive the raw 32-byte PBKDF2 key from settings
+    Only needed for KDF_MODE=pbkdf2 and for values written before the HKDF key;
+    callers wipe the returned buffer once their cipher is built
+    """
+    secret = bytearray(settings.ENCRYPTION_KEY.encode())
+    try:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=settings.SECRET_KEY[:16].encode(),
+            iterations=100000,
+        )
+        return bytearray(kdf.derive(secret))
+    finally:
+        _wipe(secret)
+
+
+# Fernet cipher, kept to decrypt values written before AES-GCM
 _fernet = None
 
+# AES-GCM values are "<version>:" + URL-safe base64 of (12-byte nonce + ciphertext + tag);
+# the version names the key: v3 = HKDF from settings, v2 = expanded from the PBKDF2 key.
+# Anything else is a Fernet token
+_AESGCM_PREFIX_HKDF = "v3:"
+_AESGCM_PREFIX_PBKDF2 = "v2:"
+_AESGCM_PREFIX_LEN = 3
+_AESGCM_NONCE_SIZE = 12
+_AESGCM_KEY_INFO = b"form-assistant aes-256-gcm"
+
+# Values written before tokens were stored as-is carry an extra base64 layer;
+# every Fernet token starts with "gAAAAA", which encodes to this prefix
+_LEGACY_TOKEN_PREFIX = b"Z0FBQUFB"
+
 
 def get_fernet() -> Fernet:
     """Get Fernet cipher instance"""
     global _fernet
     if _fernet is None:
-        _fernet = Fernet(get_encryption_key())
+        raw = _derive_raw_key()
+        key = bytearray(base64.urlsafe_b64encode(raw))
+        _fernet = Fernet(key)
+        _wipe(raw)
+        _wipe(key)
     return _fernet
 
 
+@lru_cache()
+def get_aesgcm(prefix: str) -> AESGCM:
+    """Get the AES-GCM cipher instance for a value version prefix"""
+    if prefix == _AESGCM_PREFIX_HKDF:
+        # The settings keys are already high-entropy, so one HKDF pass replaces key stretching
+        secret = bytearray(settings.ENCRYPTION_KEY.encode())
+        key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=settings.SECRET_KEY[:16].encode(),
+            info=_AESGCM_KEY_INFO,
+        ).derive(secret)
+    else:
+        secret = _derive_raw_key()
+        key = HKDFExpand(
+            algorithm=hashes.SHA256(),
+            length=32,
+            info=_AESGCM_KEY_INFO,
+        ).derive(secret)
+    _wipe(secret)
+    return AESGCM(key)
+
+
 def encrypt_sensitive_data(data: str) -> str:
     """
-    Encrypt sensitive data using Fernet (AES-128-CBC)
-    Returns base64 encoded encrypted string
+    Encrypt sensitive data using AES-256-GCM
+    Returns a version prefix + URL-safe base64 of nonce and ciphertext
     """
     if not data:
         return ""
     try:
-        fernet = get_fernet()
-        encrypted = fernet.encrypt(data.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
+        prefix = _AESGCM_PREFIX_PBKDF2 if settings.KDF_MODE == "pbkdf2" else _AESGCM_PREFIX_HKDF
+        nonce = os.urandom(_AESGCM_NONCE_SIZE)
+        encrypted = get_aesgcm(prefix).encrypt(nonce, data.encode(), None)
+        return prefix + base64.urlsafe_b64encode(nonce + encrypted).decode('ascii')
     except Exception as e:
         logger.error(f"Encryption error: {e}")
         raise ValueError("Failed to encrypt data")
@@ -80,9 +181,18 @@ def decrypt_sensitive_data(encrypted_data: str) -> str:
     if not encrypted_data:
         return ""
     try:
+        prefix = encrypted_data[:_AESGCM_PREFIX_LEN]
+        if prefix in (_AESGCM_PREFIX_HKDF, _AESGCM_PREFIX_PBKDF2):
+            raw = base64.urlsafe_b64decode(encrypted_data[_AESGCM_PREFIX_LEN:])
+            nonce, encrypted = raw[:_AESGCM_NONCE_SIZE], raw[_AESGCM_NONCE_SIZE:]
+            return get_aesgcm(prefix).decrypt(nonce, encrypted, None).decode()
+        
+        # Fernet tokens from before the switch to AES-GCM
         fernet = get_fernet()
-        decoded = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted = fernet.decrypt(decoded)
+        token = encrypted_data.encode('ascii')
+        if token.startswith(_LEGACY_TOKEN_PREFIX):
+            token = base64.urlsafe_b64decode(token)
+        decrypted = fernet.decrypt(token)
         return decrypted.decode()
     except Exception as e:
         logger.error(f"Decryption error: {e}")
@@ -100,23 +210,26 @@ def decrypt_value(encrypted_data: str) -> str:
     return decrypt_sensitive_data(encrypted_data)
 
 
+# Signing key built once; python-jose otherwise reconstructs it for every token
+_JWT_KEY = jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token
     """
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    if not expires_delta:
+        expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now = int(time.time())
     
     to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
+        "exp": now + int(expires_delta.total_seconds()),
+        "iat": now,
         "type": "access"
     })
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
@@ -125,15 +238,15 @@ def create_refresh_token(data: dict) -> str:
     Create JWT refresh token
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    now = int(time.time())
     
     to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
+        "exp": now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        "iat": now,
         "type": "refresh"
     })
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
@@ -143,7 +256,7 @@ def decode_token(token: str) -> Optional[dict]:
     Returns payload if valid, None otherwise
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _JWT_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
         logger.warning(f"Token decode error: {e}")
@@ -160,6 +273,14 @@ def hash_file(file_content: bytes) -> str:
     return hashlib.sha256(file_content).hexdigest()
 
 
+def sha256_is_accelerated() -> bool:
+    """
+    Whether hashlib.sha256 is OpenSSL's implementation (SHA-NI / ARMv8 crypto when
+    the CPU has them) rather than CPython's slower built-in fallback
+    """
+    return hashlib.sha256.__module__ == "_hashlib"
+
+
 def mask_sensitive_value(value: str, visible_chars: int = 4) -> str:
     """
     Mask sensitive value, showing only last few characters
@@ -172,55 +293,70 @@ def mask_sensitive_value(value: str, visible_chars: int = 4) -> str:
     return "X" * masked_length + value[-visible_chars:]
 
 
+# Verhoeff multiplication table
+_VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0)
+)
+
+# Verhoeff permutation table
+_VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 5, 8)
+)
+
+# Both tables fused: d[c][p[i % 8][digit]] at index (i % 8) * 100 + c * 10 + digit
+_VERHOEFF_DP = bytes(
+    _VERHOEFF_D[c][_VERHOEFF_P[i][digit]]
+    for i in range(8) for c in range(10) for digit in range(10)
+)
+
+
+# Deletes every ASCII character except 0-9
+_STRIP_ASCII_NON_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+
 def validate_aadhaar_checksum(aadhaar: str) -> bool:
     """
     Validate Aadhaar number using Verhoeff algorithm
     """
-    # Verhoeff multiplication table
-    d = [
-        [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-        [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
-        [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
-        [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
-        [4, 0, 1, 2, 3, 9, 5, 6, 7, 8],
-        [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
-        [6, 5, 9, 8, 7, 1, 0, 4, 3, 2],
-        [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
-        [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
-        [9, 8, 7, 6, 5, 4, 3, 2, 1, 0]
-    ]
-    
-    # Permutation table
-    p = [
-        [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-        [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
-        [5, 8, 0, 3, 7, 9, 6, 1, 4, 2],
-        [8, 9, 1, 6, 0, 4, 3, 5, 2, 7],
-        [9, 4, 5, 3, 1, 2, 6, 8, 7, 0],
-        [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
-        [2, 7, 9, 3, 8, 0, 6, 4, 1, 5],
-        [7, 0, 4, 6, 9, 1, 3, 2, 5, 8]
-    ]
-    
-    # Clean aadhaar number
-    aadhaar = ''.join(filter(str.isdigit, aadhaar))
+    # Clean aadhaar number (one C-level translate for the usual ASCII input)
+    if aadhaar.isascii():
+        aadhaar = aadhaar.translate(_STRIP_ASCII_NON_DIGITS)
+    else:
+        aadhaar = ''.join(filter(str.isdigit, aadhaar))
     
     if len(aadhaar) != 12:
         return False
     
     c = 0
     for i, digit in enumerate(reversed(aadhaar)):
-        c = d[c][p[i % 8][int(digit)]]
+        c = _VERHOEFF_DP[(i & 7) * 100 + c * 10 + int(digit)]
     
     return c == 0
 
 
+# PAN format: 5 letters + 4 digits + 1 letter (ASCII only)
+_PAN_PATTERN = re.compile(r'[A-Z]{5}[0-9]{4}[A-Z]')
+
+
 def validate_pan_format(pan: str) -> bool:
     """
     Validate PAN card format
     Format: AAAAA0000A (5 letters + 4 digits + 1 letter)
     """
-    import re
-    pan = pan.upper().strip()
-    pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]$'
-    return bool(re.match(pattern, pan))
+    return _PAN_PATTERN.fullmatch(pan.upper().strip()) is not None
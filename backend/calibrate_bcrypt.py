@@ -0,0 +1,14 @@
+"""
+Pick a bcrypt cost for this machine
+Usage: python calibrate_bcrypt.py [target_ms]
+Run it once on the production hardware while it is idle, then set BCRYPT_COST
+to the printed value so every worker hashes with the same cost
+"""
+import sys
+
+from app.utils.security import calibrate_bcrypt_cost
+
+if __name__ == "__main__":
+    target_ms = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    cost = calibrate_bcrypt_cost(target_ms)
+    print(f"BCRYPT_COST={cost}  # largest cost hashing within {target_ms}ms here")
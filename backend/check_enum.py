@@ -19,24 +19,21 @@ async def main():
         'ISSUE_DATE'
     ]
     
-    for val in new_values:
-        try:
-            await conn.execute(f"ALTER TYPE entitytype ADD VALUE IF NOT EXISTS '{val}'")
-            print(f"Added {val}")
-        except Exception as e:
-            print(f"{val} error: {e}")
-    
-    # Check documenttype enum and add driving_license
+    # Check documenttype enum
     result = await conn.fetch("SELECT enumlabel FROM pg_enum WHERE enumtypid = (SELECT oid FROM pg_type WHERE typname = 'documenttype') ORDER BY enumsortorder")
     print("\nCurrent documenttype enum values:")
     for r in result:
         print(f"  - {r['enumlabel']}")
     
+    # Add all new values (entitytype + driving_license documenttype) in one round trip;
+    # a multi-statement query runs as one implicit transaction, which ADD VALUE allows on PostgreSQL 12+
+    statements = [f"ALTER TYPE entitytype ADD VALUE IF NOT EXISTS '{val}'" for val in new_values]
+    statements.append("ALTER TYPE documenttype ADD VALUE IF NOT EXISTS 'DRIVING_LICENSE'")
     try:
-        await conn.execute("ALTER TYPE documenttype ADD VALUE IF NOT EXISTS 'DRIVING_LICENSE'")
-        print("Added DRIVING_LICENSE to documenttype")
+        await conn.execute(";\n".join(statements) + ";")
+        print(f"\nAdded {', '.join(new_values)} to entitytype and DRIVING_LICENSE to documenttype")
     except Exception as e:
-        print(f"DRIVING_LICENSE documenttype error: {e}")
+        print(f"\nAdding enum values failed (nothing was changed): {e}")
     
     # Check again
     result = await conn.fetch("SELECT enumlabel FROM pg_enum WHERE enumtypid = (SELECT oid FROM pg_type WHERE typname = 'entitytype') ORDER BY enumsortorder")
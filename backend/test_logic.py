@@ -24,24 +24,25 @@ extracted = service._extract_name(text, "en")
 print(f"Extracted: {extracted}")
 
 print("\n--- Testing DOB Extraction ---")
-# Need to access pattern manually or dummy call
-import re
+# Use the service's precompiled (lowercased) patterns, as the real extractor does
 from app.models.document import EntityType
-patterns = service.ENTITY_PATTERNS[EntityType.DATE_OF_BIRTH]
+patterns = service.COMPILED_ENTITY_PATTERNS[EntityType.DATE_OF_BIRTH]
+text_lower = text.lower()
 for p in patterns:
-    match = re.search(p, text, re.IGNORECASE | re.MULTILINE)
-    if match:
-        print(f"Matched DOB with pattern '{p}': {match.group(1)}")
+    value = service._search_value(p, text, text_lower)
+    if value is not None:
+        print(f"Matched DOB with pattern '{p.pattern}': {value}")
     else:
-        print(f"No match for pattern '{p}'")
+        print(f"No match for pattern '{p.pattern}'")
 
 print("\n--- Testing PAN Regex ---")
 pan_text = """Permanent Account Number
 PECPKO354E
 C Naveen Kumar"""
-pan_patterns = service.ENTITY_PATTERNS[EntityType.PAN_NUMBER]
+pan_patterns = service.COMPILED_ENTITY_PATTERNS[EntityType.PAN_NUMBER]
+pan_text_lower = pan_text.lower()
 for p in pan_patterns:
-    match = re.search(p, pan_text, re.IGNORECASE | re.MULTILINE)
-    if match:
-        print(f"Matched PAN with pattern '{p}': {match.group(1)}")
+    value = service._search_value(p, pan_text, pan_text_lower)
+    if value is not None:
+        print(f"Matched PAN with pattern '{p.pattern}': {value}")
 
@@ -2,28 +2,25 @@
 Test suite for the Form Filling Assistant API
 """
 import pytest
-import asyncio
+import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from app.main import app
 from app.config import settings
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Every test shares the session event loop so the session-wide client can be reused
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def client():
-    """Create async test client."""
-    async with AsyncClient(
-        transport=ASGITransport(app=app),
-        base_url="http://test"
-    ) as ac:
-        yield ac
+    """Create one async test client for the whole session, with app startup/shutdown run once."""
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as ac:
+            yield ac
 
 
 class TestHealthEndpoints:
@@ -0,0 +1,49 @@
+"""
+Tests for OCR name validation and the garbage-token rules
+"""
+import pytest
+
+from app.services.ocr_service import OCRService
+
+
+@pytest.fixture(scope="module")
+def ocr_service():
+    return OCRService()
+
+
+class TestNameValidation:
+    """Test which extracted names _is_valid_english_name accepts."""
+    
+    @pytest.mark.parametrize("name", [
+        "John Smith III",
+        "Anna McDONALD",
+        "Mary O'BRIEN",
+        "RAJESH KUMAR",
+    ])
+    def test_accepts_real_names(self, ocr_service, name):
+        """Generation suffixes, Mc/O' surnames and all-caps names pass."""
+        assert ocr_service._is_valid_english_name(name)
+    
+    @pytest.mark.parametrize("name", ["IIII", "Gufweniseny", "KUMARi"])
+    def test_rejects_ocr_garbage(self, ocr_service, name):
+        """Repeated characters, garbled regional text and stray case changes fail."""
+        assert not ocr_service._is_valid_english_name(name)
+    
+    def test_consonant_run_is_checked_per_word(self, ocr_service):
+        """A consonant run across a word boundary doesn't reject the name."""
+        assert ocr_service._is_valid_english_name("Ann McDONALD")
+        assert not ocr_service._is_valid_english_name("Ann Bkrtzzk")
+
+
+class TestGarbageToken:
+    """Test the per-token garbage rules."""
+    
+    @pytest.mark.parametrize("token", ["II", "III", "VIII", "McDONALD", "MacDONALD", "O'BRIEN"])
+    def test_name_tokens_pass(self, ocr_service, token):
+        """Roman-numeral suffixes and prefixed surnames are not garbage."""
+        assert not ocr_service._is_garbage_token(token)
+    
+    @pytest.mark.parametrize("token", ["IIII", "Sooo", "RAVi", "raVi", "x" * 21])
+    def test_noise_tokens_fail(self, ocr_service, token):
+        """Character runs, mid-word case changes and overlong tokens are garbage."""
+        assert ocr_service._is_garbage_token(token)
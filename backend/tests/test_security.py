@@ -0,0 +1,128 @@
+"""
+Tests for encryption at rest and the encrypted-value migration
+"""
+import base64
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.utils.security import decrypt_sensitive_data, encrypt_sensitive_data, get_fernet
+
+
+SAMPLE_VALUES = ["Rahul Kumar", "1234 5678 9012", "ABCDE1234F", "ராகுல் குமார்"]
+
+
+def _load_migration(name: str):
+    """Import an alembic revision module by file name (they start with digits)"""
+    path = Path(__file__).resolve().parent.parent / "alembic" / "versions" / name
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestEncryption:
+    """Test encrypt/decrypt round trips across value formats."""
+    
+    @pytest.mark.parametrize("kdf_mode, prefix", [("hkdf", "v3:"), ("pbkdf2", "v2:")])
+    def test_round_trip(self, monkeypatch, kdf_mode, prefix):
+        """Values encrypt to the mode's version prefix and decrypt back."""
+        monkeypatch.setattr(settings, "KDF_MODE", kdf_mode)
+        for value in SAMPLE_VALUES:
+            encrypted = encrypt_sensitive_data(value)
+            assert encrypted.startswith(prefix)
+            assert decrypt_sensitive_data(encrypted) == value
+    
+    def test_decrypts_values_from_either_mode(self, monkeypatch):
+        """Switching KDF_MODE keeps values written under the other mode readable."""
+        monkeypatch.setattr(settings, "KDF_MODE", "pbkdf2")
+        written_v2 = encrypt_sensitive_data("Priya Sharma")
+        monkeypatch.setattr(settings, "KDF_MODE", "hkdf")
+        assert decrypt_sensitive_data(written_v2) == "Priya Sharma"
+    
+    def test_nonce_is_random(self):
+        """Encrypting the same value twice gives different ciphertexts."""
+        assert encrypt_sensitive_data("same") != encrypt_sensitive_data("same")
+    
+    def test_empty_value(self):
+        """Empty values pass through unchanged."""
+        assert encrypt_sensitive_data("") == ""
+        assert decrypt_sensitive_data("") == ""
+    
+    def test_decrypts_legacy_fernet_token(self):
+        """Plain Fernet tokens from before AES-GCM still decrypt."""
+        token = get_fernet().encrypt("Rahul Kumar".encode()).decode()
+        assert token.startswith("gAAAAA")
+        assert decrypt_sensitive_data(token) == "Rahul Kumar"
+    
+    def test_decrypts_double_wrapped_fernet_token(self):
+        """Fernet tokens stored with the old extra base64 layer still decrypt."""
+        token = get_fernet().encrypt("Rahul Kumar".encode())
+        wrapped = base64.urlsafe_b64encode(token).decode()
+        assert wrapped.startswith("Z0FBQUFB")
+        assert decrypt_sensitive_data(wrapped) == "Rahul Kumar"
+    
+    def test_tampered_value_is_rejected(self):
+        """A modified ciphertext fails authentication."""
+        encrypted = encrypt_sensitive_data("Rahul Kumar")
+        tampered = encrypted[:-2] + ("A" if encrypted[-2] != "A" else "B") + encrypted[-1]
+        with pytest.raises(ValueError):
+            decrypt_sensitive_data(tampered)
+    
+    def test_unknown_kdf_mode_rejected(self):
+        """Settings refuse a KDF_MODE other than hkdf or pbkdf2."""
+        with pytest.raises(ValidationError):
+            Settings(KDF_MODE="scrypt")
+
+
+class TestUnwrapMigration:
+    """Test the 005 migration that drops the outer base64 layer."""
+    
+    @pytest.fixture
+    def connection(self):
+        """In-memory database with the encrypted columns the migration rewrites."""
+        engine = sa.create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(sa.text(
+                "CREATE TABLE extracted_entities (id TEXT PRIMARY KEY, encrypted_value TEXT, translated_value TEXT)"
+            ))
+            conn.execute(sa.text(
+                "CREATE TABLE users (id TEXT PRIMARY KEY, digilocker_access_token TEXT, digilocker_refresh_token TEXT)"
+            ))
+            yield conn
+        engine.dispose()
+    
+    def _run(self, conn, direction: str):
+        migration = _load_migration("005_unwrap_encrypted_values.py")
+        with Operations.context(MigrationContext.configure(conn)):
+            getattr(migration, direction)()
+    
+    def test_upgrade_and_downgrade(self, connection):
+        """Wrapped tokens are unwrapped, other values are left alone, and downgrade restores them."""
+        token = get_fernet().encrypt("Rahul Kumar".encode()).decode()
+        wrapped = base64.urlsafe_b64encode(token.encode()).decode()
+        aes_value = encrypt_sensitive_data("Rahul Kumar")
+        connection.execute(
+            sa.text("INSERT INTO extracted_entities VALUES ('e1', :wrapped, NULL), ('e2', :aes, NULL)"),
+            {"wrapped": wrapped, "aes": aes_value}
+        )
+        connection.execute(
+            sa.text("INSERT INTO users VALUES ('u1', :wrapped, :wrapped)"), {"wrapped": wrapped}
+        )
+        
+        self._run(connection, "upgrade")
+        entities = dict(connection.execute(sa.text("SELECT id, encrypted_value FROM extracted_entities")).all())
+        user = connection.execute(sa.text("SELECT digilocker_access_token, digilocker_refresh_token FROM users")).one()
+        assert entities == {"e1": token, "e2": aes_value}
+        assert tuple(user) == (token, token)
+        assert decrypt_sensitive_data(entities["e1"]) == "Rahul Kumar"
+        
+        self._run(connection, "downgrade")
+        entities = dict(connection.execute(sa.text("SELECT id, encrypted_value FROM extracted_entities")).all())
+        assert entities == {"e1": wrapped, "e2": aes_value}
@@ -8,11 +8,23 @@ TEST_PASSWORD = "StrongP@ss1!"
 
 PNG_BASE64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMBOgbdB9kAAAAASUVORK5CYII="
 SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "sample.png")
+EXPECTED_SIZE = 68  # Decoded length of PNG_BASE64
 
 
 def ensure_sample_file():
-    with open(SAMPLE_PATH, "wb") as f:
-        f.write(base64.b64decode(PNG_BASE64))
+    # Only decode and write the sample when it's missing or truncated
+    if not os.path.exists(SAMPLE_PATH) or os.path.getsize(SAMPLE_PATH) != EXPECTED_SIZE:
+        with open(SAMPLE_PATH, "wb") as f:
+            f.write(base64.b64decode(PNG_BASE64))
+
+
+def make_client():
+    # One pooled client for every call in the run (HTTP/2 is negotiated when API_BASE is https)
+    return httpx.Client(
+        timeout=20,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=30)
+    )
 
 
 def register_or_login(client):
@@ -34,40 +46,40 @@ def register_or_login(client):
     return data["access_token"], data.get("refresh_token")
 
 
-def upload_and_extract(doc_type="pan"):
+def upload_and_extract(client, doc_type="pan"):
     ensure_sample_file()
-    with httpx.Client(timeout=20) as client:
-        access, _ = register_or_login(client)
-        headers = {"Authorization": f"Bearer {access}"}
-        # Upload
-        with open(SAMPLE_PATH, "rb") as f:
-            files = {
-                "document_type": (None, doc_type),
-                "file": ("sample.png", f, "image/png"),
-            }
-            ur = client.post(f"{API_BASE}/documents/upload", headers=headers, files=files)
-        print("Upload status:", ur.status_code, ur.text)
-        ur.raise_for_status()
-        up = ur.json()
-        doc_id = up["document_id"]
-        # Extract
-        er = client.post(f"{API_BASE}/documents/extract", headers=headers, files={
-            "document_id": (None, doc_id)
-        })
-        print("Extract status:", er.status_code)
-        print(er.text)
-        er.raise_for_status()
-        return er.json()
+    access, _ = register_or_login(client)
+    headers = {"Authorization": f"Bearer {access}"}
+    # Upload
+    with open(SAMPLE_PATH, "rb") as f:
+        files = {
+            "document_type": (None, doc_type),
+            "file": ("sample.png", f, "image/png"),
+        }
+        ur = client.post(f"{API_BASE}/documents/upload", headers=headers, files=files)
+    print("Upload status:", ur.status_code, ur.text)
+    ur.raise_for_status()
+    up = ur.json()
+    doc_id = up["document_id"]
+    # Extract
+    er = client.post(f"{API_BASE}/documents/extract", headers=headers, files={
+        "document_id": (None, doc_id)
+    })
+    print("Extract status:", er.status_code)
+    print(er.text)
+    er.raise_for_status()
+    return er.json()
 
 
 if __name__ == "__main__":
-    try:
-        data = upload_and_extract("aadhaar")
-        print("OK aadhaar keys:", list(data.keys()))
-    except Exception as e:
-        print("Aadhaar test failed:", e)
-    try:
-        data = upload_and_extract("pan")
-        print("OK pan keys:", list(data.keys()))
-    except Exception as e:
-        print("PAN test failed:", e)
+    with make_client() as client:
+        try:
+            data = upload_and_extract(client, "aadhaar")
+            print("OK aadhaar keys:", list(data.keys()))
+        except Exception as e:
+            print("Aadhaar test failed:", e)
+        try:
+            data = upload_and_extract(client, "pan")
+            print("OK pan keys:", list(data.keys()))
+        except Exception as e:
+            print("PAN test failed:", e)